@@ -1,7 +1,17 @@
 try:
-    from src.game import *
+    from src.game import main
 except ImportError:
     print("Erreur lors de l'importation du module src.game")
     print("Vérifiez que le fichier src/game.py existe bien")
     exit(1)
-    
\ No newline at end of file
+
+import argparse
+
+parser = argparse.ArgumentParser(description="Jeu de Lemmings.")
+parser.add_argument("--record", metavar="FICHIER", help="enregistre la partie pour la rejouer avec python -m src.replay FICHIER")
+parser.add_argument("--seed", type=int, default=None, help="graine du générateur aléatoire de la partie")
+parser.add_argument("--profile", metavar="FICHIER", help="active le profileur et exporte ses mesures (CSV, ou JSONL si FICHIER se termine par .jsonl)")
+parser.add_argument("--level", default="default", help="nom du premier niveau joué (dans assets/levels)")
+args = parser.parse_args()
+
+main(record=args.record, seed=args.seed, profile=args.profile, level=args.level)
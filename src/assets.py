@@ -0,0 +1,89 @@
+"""
+Ce module charge les ressources du jeu : images, animations, effets sonores et musique.
+
+Les images et les animations sont chargées en parallèle par un groupe de threads, dès la
+création du gestionnaire : la fenêtre peut s'ouvrir pendant ce temps, et seul le premier
+accès à une ressource attend la fin de son chargement. Les effets sonores ne sont décodés
+qu'à leur première utilisation. La musique de fond n'est jamais décodée en entier : elle est
+lue au fur et à mesure depuis le disque par pygame.mixer.music.
+
+Classes :
+- Assets : Gestionnaire des ressources du jeu.
+
+Constantes :
+- IMAGES : Les images chargées en arrière-plan à la création du gestionnaire.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+import pygame
+
+from src.constants import audio, imgs
+from src.sprites import charger_animations
+
+IMAGES = ("map.png", "sortie.png")
+
+
+class Assets:
+    """
+    Gestionnaire des ressources du jeu.
+
+    Paramètres :
+    - images : Les noms des images (dans assets/img) à charger en arrière-plan.
+    """
+
+    def __init__(self, images=IMAGES):
+        pool = ThreadPoolExecutor(max_workers=len(images) + 1, thread_name_prefix="assets")
+        self._images = {name: pool.submit(pygame.image.load, os.path.join(imgs, name)) for name in images}
+        self._animations = pool.submit(charger_animations)
+        # Les chargements déjà soumis se terminent, puis les threads s'arrêtent d'eux-mêmes
+        pool.shutdown(wait=False)
+        self._sounds = {}
+
+    def image(self, name):
+        """
+        Retourne une image, en attendant la fin de son chargement si besoin.
+
+        Paramètres :
+        - name : Le nom du fichier dans assets/img. Une image absente de la liste donnée au
+          constructeur est chargée immédiatement.
+
+        Retourne :
+        Une surface Pygame.
+        """
+        if name not in self._images:
+            return pygame.image.load(os.path.join(imgs, name))
+        return self._images[name].result()
+
+    def animations(self):
+        """
+        Retourne les animations des lemmings (voir charger_animations), en attendant la fin de leur chargement si besoin.
+        """
+        return self._animations.result()
+
+    def sound(self, name):
+        """
+        Retourne un effet sonore, décodé lors du premier appel.
+
+        Paramètres :
+        - name : Le nom du fichier dans assets/audio.
+
+        Retourne :
+        Un objet pygame.mixer.Sound.
+        """
+        sound = self._sounds.get(name)
+        if sound is None:
+            sound = self._sounds[name] = pygame.mixer.Sound(os.path.join(audio, name))
+        return sound
+
+    def play_music(self, name, volume=1.0):
+        """
+        Joue une musique en boucle, lue depuis le disque au fur et à mesure.
+
+        Paramètres :
+        - name : Le nom du fichier dans assets/audio.
+        - volume : Le volume, entre 0 et 1.
+        """
+        pygame.mixer.music.load(os.path.join(audio, name))
+        pygame.mixer.music.set_volume(volume)
+        pygame.mixer.music.play(-1)  # -1 will loop the music indefinitely
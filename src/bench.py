@@ -0,0 +1,314 @@
+"""
+Ce module mesure les performances de la boucle de simulation sur des scénarios scriptés.
+
+Chaque scénario place un nombre donné de lemmings (10, 100, 1 000 ou 10 000) dans une
+situation type : marche, chute, marche au milieu de lemmings arrêtés, ou creusage. Le monde
+est ensuite avancé pas par pas, et le temps de chaque phase est mesuré séparément :
+transitions (ETAPE 1), actions (ETAPE 2), animation et affichage (ETAPE 3). Le rapport
+donne la médiane (p50) et le 99e centile (p99) de chaque phase, au format JSON, pour être
+comparé d'un commit à l'autre.
+
+Utilisation en ligne de commande :
+
+    python -m src.bench --out bench.json
+    python -m src.bench --counts 10 100 --compare bench.json
+    python -m src.bench --counts 10000 --processes 4
+
+Avec --processes, les transitions et les actions sont réparties entre plusieurs processus
+(voir src/parallel.py) et mesurées ensemble, dans la phase transitions.
+
+Fonctions :
+- make_world(kind, count, seed) : Crée un monde préparé pour un scénario.
+- run_scenario(kind, count, ticks, warmup, seed, processes) : Mesure un scénario.
+- run(kinds, counts, ticks, warmup, seed, processes) : Mesure tous les scénarios demandés.
+- compare(results, baseline, tolerance) : Compare deux rapports et liste les régressions.
+
+Constantes :
+- KINDS : Les types de scénarios.
+- COUNTS : Les nombres de lemmings mesurés par défaut.
+- PHASES : Les phases mesurées à chaque pas.
+"""
+
+import os
+
+# L'affichage est mesuré sans fenêtre visible
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time as _time
+import numpy as np
+import pygame
+
+from src.engine import _charger_ressources
+from src.parallel import ParallelTick
+from src.render import DirtyRenderer
+from src.world import (
+    World,
+    EtatMarche,
+    EtatChute,
+    EtatStop,
+    EtatMiner,
+    EtatMinerHorizontal,
+    EtatMinerDiagonal,
+    creerLemming,
+)
+
+KINDS = ("walking", "falling", "blocked", "digging")
+COUNTS = (10, 100, 1000, 10000)
+PHASES = ("transitions", "actions", "animate", "render")
+
+
+def _floor_cells(world, width, height):
+    """
+    Cherche les pixels de sol sur lesquels un lemming peut se tenir debout, entièrement sur la
+    carte : un pixel plein, surmonté d'au moins `height` lignes vides sur les `width` colonnes
+    qui commencent à ce pixel. Le plafond de la carte (le sol le plus haut d'une colonne) n'en
+    fait pas partie, puisqu'il n'a rien au-dessus de lui.
+
+    Paramètres :
+    - world : Le monde du jeu.
+    - width, height : La taille du lemming.
+
+    Retourne :
+    Un tuple (xs, ys) de tableaux NumPy : la colonne de gauche et la ligne du sol.
+    """
+    solid = world.terrain.solid
+    rows, cols = solid.shape
+    # Nombre de lignes vides juste au-dessus de chaque pixel, dans sa colonne (0 sur la
+    # première ligne : le haut de la carte compte comme un plafond)
+    clear = np.zeros((rows, cols), np.int32)
+    for y in range(1, rows):
+        clear[y] = np.where(solid[y - 1], 0, clear[y - 1] + 1)
+    # La même chose pour `width` colonnes consécutives
+    last = cols - width + 1
+    span = clear[:, :last].copy()
+    for dx in range(1, width):
+        np.minimum(span, clear[:, dx:last + dx], out=span)
+    ys, xs = np.nonzero(solid[:, :last] & (span >= height))
+    return xs, ys
+
+
+def make_world(kind, count, seed=0):
+    """
+    Crée un monde préparé pour un scénario.
+
+    Paramètres :
+    - kind : Le type de scénario (voir KINDS).
+    - count : Le nombre de lemmings.
+    - seed : La graine utilisée pour placer les lemmings et pour le monde.
+
+    Retourne :
+    Un nouvel objet World, dans lequel aucun autre lemming n'apparaîtra.
+    """
+    fond, sortie, animations = _charger_ressources()
+    world = World(fond.copy(), sortie, animations, nb_lemmings=count, time_limit=10 ** 6, seed=seed)
+    rng = np.random.default_rng(seed)
+    for _ in range(count):
+        creerLemming(world)
+    world.compteur_creation = count
+
+    L = world.lemmings
+    L.vx[:] = rng.choice((-1, 1), count)
+    if kind == "falling":
+        # Du haut de la carte, au-dessus de n'importe quelle colonne
+        L.x[:] = rng.integers(10, world.terrain.width - 40, count)
+        L.y[:] = rng.integers(0, 40, count)
+        L.etat[:] = EtatChute
+    else:
+        # Debout sur un pixel de sol tiré au hasard, avec assez de place au-dessus
+        xs, floors = _floor_cells(world, int(world.frame_w.max()), int(world.frame_h.max()))
+        pick = rng.integers(0, xs.size, count)
+        L.x[:] = xs[pick]
+        L.y[:] = floors[pick] - L.h
+        assert (L.y >= 0).all() and (L.y + L.h <= world.terrain.height).all()
+        L.etat[:] = EtatMarche
+        if kind == "digging":
+            L.etat[:] = rng.choice((EtatMiner, EtatMinerHorizontal, EtatMinerDiagonal), count)
+        elif kind == "blocked":
+            # Un lemming sur dix s'arrête et bloque les autres
+            for lemming in range(0, count, 10):
+                world.assign(lemming, EtatStop)
+    L.prev_x[:] = L.x
+    L.prev_y[:] = L.y
+    return world
+
+
+def _percentiles(samples):
+    """
+    Résume une liste de durées (en secondes) en millisecondes.
+    """
+    samples = np.asarray(samples) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(samples, 50)), 4),
+        "p99_ms": round(float(np.percentile(samples, 99)), 4),
+        "mean_ms": round(float(samples.mean()), 4),
+    }
+
+
+def run_scenario(kind, count, ticks=100, warmup=5, seed=0, processes=None):
+    """
+    Mesure un scénario.
+
+    Les méthodes transitions, actions et animate du monde sont remplacées par des versions
+    chronométrées : World.step est appelé normalement, et chaque phase est mesurée à part.
+    L'affichage est mesuré avec DirtyRenderer, sur une fenêtre invisible.
+
+    Paramètres :
+    - kind : Le type de scénario (voir KINDS).
+    - count : Le nombre de lemmings.
+    - ticks : Le nombre de pas mesurés.
+    - warmup : Le nombre de pas effectués avant les mesures.
+    - seed : La graine du scénario.
+    - processes : Le nombre de processus de calcul (voir src/parallel.py), ou None.
+
+    Retourne :
+    Un dictionnaire décrivant le scénario et les percentiles de chaque phase.
+    """
+    world = make_world(kind, count, seed)
+    if processes:
+        ParallelTick(world, processes)
+    screen = pygame.display.set_mode(world.fond.get_size())
+    renderer = DirtyRenderer(screen, world)
+    samples = {phase: [] for phase in PHASES}
+
+    def timed(phase, method):
+        def wrapper(*args):
+            start = _time.perf_counter()
+            method(*args)
+            samples[phase].append(_time.perf_counter() - start)
+        return wrapper
+
+    for tick in range(warmup + ticks):
+        if tick == warmup:
+            samples = {phase: [] for phase in PHASES}
+            for phase in PHASES[:3]:
+                setattr(world, phase, timed(phase, getattr(World, phase).__get__(world)))
+            if world.parallel is not None:
+                # Les transitions et les actions sont mesurées ensemble
+                world.parallel.step = timed("transitions", world.parallel.step)
+        world.step()
+        world.pop_events()
+        start = _time.perf_counter()
+        renderer.begin()
+        renderer.present()
+        samples["render"].append(_time.perf_counter() - start)
+    if world.parallel is not None:
+        world.parallel.close()
+
+    return {
+        "name": "{}-{}".format(kind, count),
+        "kind": kind,
+        "lemmings": count,
+        "remaining": len(world.lemmings),
+        "ticks": ticks,
+        "processes": processes or 1,
+        # Un pas sans lemming n'appelle ni transitions ni actions : la phase peut manquer
+        "phases": {phase: _percentiles(samples[phase]) for phase in PHASES if samples[phase]},
+    }
+
+
+def _git_commit():
+    """
+    Retourne le commit courant, ou None si le dépôt git n'est pas disponible.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(kinds=KINDS, counts=COUNTS, ticks=100, warmup=5, seed=0, processes=None):
+    """
+    Mesure tous les scénarios demandés.
+
+    Paramètres :
+    - kinds : Les types de scénarios (voir KINDS).
+    - counts : Les nombres de lemmings.
+    - ticks, warmup, seed, processes : Voir run_scenario.
+
+    Retourne :
+    Un dictionnaire contenant la description de la machine et du commit ("meta") et la
+    liste des résultats des scénarios ("scenarios").
+    """
+    pygame.display.init()
+    scenarios = [run_scenario(kind, count, ticks, warmup, seed, processes) for count in counts for kind in kinds]
+    pygame.display.quit()
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "date": _time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pygame": pygame.version.ver,
+            "machine": platform.machine(),
+            "ticks": ticks,
+            "warmup": warmup,
+            "seed": seed,
+            "processes": processes or 1,
+        },
+        "scenarios": scenarios,
+    }
+
+
+def compare(results, baseline, tolerance=1.2):
+    """
+    Compare deux rapports et liste les régressions.
+
+    Paramètres :
+    - results : Le rapport mesuré (voir run).
+    - baseline : Le rapport de référence, par exemple celui du commit précédent.
+    - tolerance : Le rapport des médianes au-delà duquel une phase est considérée comme plus lente.
+
+    Retourne :
+    La liste des régressions, sous forme de tuples (scénario, phase, p50 de référence, p50 mesuré).
+    """
+    reference = {s["name"]: s["phases"] for s in baseline["scenarios"]}
+    regressions = []
+    for scenario in results["scenarios"]:
+        before = reference.get(scenario["name"], {})
+        for phase, stats in scenario["phases"].items():
+            if phase in before and stats["p50_ms"] > before[phase]["p50_ms"] * tolerance:
+                regressions.append((scenario["name"], phase, before[phase]["p50_ms"], stats["p50_ms"]))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mesure des performances de la simulation de Lemmings.")
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=KINDS, help="types de scénarios")
+    parser.add_argument("--counts", nargs="+", type=int, default=COUNTS, help="nombres de lemmings")
+    parser.add_argument("--ticks", type=int, default=100, help="nombre de pas mesurés par scénario")
+    parser.add_argument("--warmup", type=int, default=5, help="nombre de pas avant les mesures")
+    parser.add_argument("--seed", type=int, default=0, help="graine des scénarios")
+    parser.add_argument("--processes", type=int, default=None, help="nombre de processus de calcul (par défaut, un seul processus)")
+    parser.add_argument("--out", help="fichier JSON où écrire le rapport (par défaut, la sortie standard)")
+    parser.add_argument("--compare", metavar="REFERENCE", help="rapport JSON de référence à comparer")
+    parser.add_argument("--tolerance", type=float, default=1.2, help="ralentissement toléré avant de signaler une régression")
+    args = parser.parse_args()
+
+    results = run(args.kinds, args.counts, args.ticks, args.warmup, args.seed, args.processes)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    for scenario in results["scenarios"]:
+        summary = "  ".join(
+            "{} {:.3f}/{:.3f}".format(phase, stats["p50_ms"], stats["p99_ms"])
+            for phase, stats in scenario["phases"].items()
+        )
+        print("{:<16} {}".format(scenario["name"], summary), file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for name, phase, before, after in regressions:
+            print("REGRESSION {} {} : p50 {:.3f} ms -> {:.3f} ms".format(name, phase, before, after), file=sys.stderr)
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,111 @@
+"""
+Ce module gère la caméra : la partie de la carte affichée dans la fenêtre.
+
+Une carte peut être bien plus grande que la fenêtre (jusqu'à 10 000 × 2 000 pixels et plus) :
+seule la zone vue par la caméra est dessinée (voir DirtyRenderer dans src/render.py), et les
+lemmings hors de cette zone sont simulés sans être dessinés. Les positions de la souris sont
+converties en positions sur la carte avant d'être transmises à la simulation.
+
+Classes :
+- Camera : La zone de la carte affichée dans la fenêtre.
+
+Constantes :
+- SCROLL_SPEED : La vitesse de défilement au clavier, en pixels par seconde.
+"""
+
+import pygame
+
+SCROLL_SPEED = 600
+
+
+class Camera:
+    """
+    La zone de la carte affichée dans la fenêtre.
+
+    La caméra ne sort jamais de la carte ; si la carte est plus petite que la fenêtre, elle
+    reste en (0, 0).
+
+    Paramètres :
+    - view_size : Un tuple (largeur, hauteur) de la zone affichée (la taille de la fenêtre).
+    - world_size : Un tuple (largeur, hauteur) de la carte.
+
+    Attributs :
+    - x, y : La position sur la carte du coin haut gauche de la zone affichée.
+    """
+
+    def __init__(self, view_size, world_size):
+        self.width, self.height = view_size
+        self.world_width, self.world_height = world_size
+        self.x = 0
+        self.y = 0
+
+    @property
+    def rect(self):
+        """
+        Le pygame.Rect de la zone affichée, en coordonnées de la carte.
+        """
+        return pygame.Rect(self.x, self.y, self.width, self.height)
+
+    def move_to(self, x, y):
+        """
+        Place le coin haut gauche de la zone affichée, sans sortir de la carte.
+
+        Paramètres :
+        - x, y : La position souhaitée sur la carte.
+
+        Retourne :
+        Un booléen indiquant si la caméra a bougé.
+        """
+        x = max(0, min(int(x), self.world_width - self.width))
+        y = max(0, min(int(y), self.world_height - self.height))
+        moved = (x, y) != (self.x, self.y)
+        self.x, self.y = x, y
+        return moved
+
+    def move(self, dx, dy):
+        """
+        Déplace la zone affichée.
+
+        Paramètres :
+        - dx, dy : Le déplacement en pixels.
+
+        Retourne :
+        Un booléen indiquant si la caméra a bougé.
+        """
+        return self.move_to(self.x + dx, self.y + dy)
+
+    def center_on(self, x, y):
+        """
+        Centre la zone affichée sur un point de la carte (autant que possible).
+
+        Paramètres :
+        - x, y : Le point de la carte.
+
+        Retourne :
+        Un booléen indiquant si la caméra a bougé.
+        """
+        return self.move_to(x - self.width // 2, y - self.height // 2)
+
+    def to_world(self, pos):
+        """
+        Convertit une position de la fenêtre (souris) en position sur la carte.
+
+        Paramètres :
+        - pos : Un tuple (x, y) dans la fenêtre.
+
+        Retourne :
+        Un tuple (x, y) sur la carte.
+        """
+        return pos[0] + self.x, pos[1] + self.y
+
+    def to_screen(self, rect):
+        """
+        Convertit une zone de la carte en zone de la fenêtre.
+
+        Paramètres :
+        - rect : Un pygame.Rect sur la carte.
+
+        Retourne :
+        Un nouveau pygame.Rect dans la fenêtre.
+        """
+        return rect.move(-self.x, -self.y)
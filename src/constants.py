@@ -0,0 +1,34 @@
+"""
+Ce module regroupe les constantes partagées par le jeu, la simulation et l'affichage.
+
+Constantes :
+- BLACK : Un tuple représentant la couleur noire.
+- RED : Un tuple représentant la couleur rouge.
+- GREEN : Un tuple représentant la couleur verte.
+- WHITE : Un tuple représentant la couleur blanche.
+- LARG : La taille (en pixels) d'une case de la planche de sprites.
+- assets, imgs, audio, levels : Les chemins des répertoires de ressources.
+- cache : Le chemin du répertoire des données précalculées (recréées si absentes).
+- saves : Le chemin du répertoire des sauvegardes de parties (voir src/savestate.py).
+"""
+
+import os, inspect
+
+BLACK = (0, 0, 0, 255)
+RED = (255, 0, 0, 255)
+GREEN = (0, 255, 0, 255)
+WHITE = (255, 255, 255, 255)
+
+LARG = 30
+
+# recherche du répertoire de travail
+scriptPATH = os.path.abspath(
+    inspect.getsourcefile(lambda: 0)
+)  # compatible interactive Python Shell
+scriptDIR = os.path.dirname(scriptPATH)
+assets = os.path.join(scriptDIR, "..", "assets")
+imgs = os.path.join(assets, "img")
+audio = os.path.join(assets, "audio")
+levels = os.path.join(assets, "levels")
+cache = os.path.join(scriptDIR, "..", ".cache")
+saves = os.path.join(scriptDIR, "..", "saves")
@@ -0,0 +1,106 @@
+"""
+Ce module permet de simuler une partie sans affichage, plus vite que le temps réel.
+
+Aucune fenêtre n'est ouverte, le mixeur n'est pas initialisé et la boucle ne fait aucune
+pause : chaque pas de simulation s'enchaîne immédiatement. Les images du niveau et les
+animations ne sont chargées qu'une fois par processus, ce qui permet d'évaluer de nombreux
+niveaux à la suite.
+
+Utilisation en ligne de commande :
+
+    python -m src.engine --ticks 2400 --runs 10
+    python -m src.engine --lemmings 5000 --processes 4
+
+Avec --processes, les transitions et les actions sont réparties entre plusieurs processus
+(voir src/parallel.py), pour le même résultat.
+
+Fonctions :
+- simulate(max_ticks, processes, **kwargs) : Simule une partie sans affichage et retourne ses statistiques.
+"""
+
+import argparse
+import json
+import time as _time
+
+from src.assets import Assets
+from src.parallel import ParallelTick
+from src.world import TICKS_PER_SECOND, World
+
+_ressources = None
+
+
+def _charger_ressources():
+    """
+    Charge une seule fois par processus le décor, la sortie et les animations.
+
+    Retourne :
+    Un tuple (fond, sortie, animations). Le décor doit être copié avant d'être utilisé, car
+    le monde le modifie en creusant.
+    """
+    global _ressources
+    if _ressources is None:
+        assets = Assets()
+        _ressources = (assets.image("map.png"), assets.image("sortie.png"), assets.animations())
+    return _ressources
+
+
+def simulate(max_ticks=None, processes=None, **kwargs):
+    """
+    Simule une partie sans affichage et retourne ses statistiques.
+
+    La simulation s'arrête dès que la partie est gagnée ou perdue, ou après max_ticks pas.
+
+    Paramètres :
+    - max_ticks : Le nombre maximal de pas de simulation (par défaut, la durée du niveau).
+    - processes : Le nombre de processus entre lesquels répartir les transitions et les
+      actions (voir src/parallel.py), ou None pour tout simuler dans ce processus.
+    - kwargs : Les paramètres optionnels transmis au constructeur de World (nb_lemmings, time_limit, ...).
+
+    Retourne :
+    Un dictionnaire contenant le résultat ("WIN", "LOOSE" ou None), le nombre de lemmings
+    créés, arrivés, morts et restants, le nombre de pas simulés, le temps de jeu utilisé
+    (en secondes) et le temps réel de calcul (en secondes).
+    """
+    fond, sortie, animations = _charger_ressources()
+    world = World(fond.copy(), sortie, animations, **kwargs)
+    if max_ticks is None:
+        max_ticks = (world.time_limit + 1) * TICKS_PER_SECOND
+
+    start = _time.perf_counter()
+    if processes:
+        ParallelTick(world, processes)
+    tick = 0
+    result = None
+    try:
+        while tick < max_ticks and result is None:
+            world.step()
+            world.pop_events()
+            result = world.result()
+            tick += 1
+    finally:
+        if world.parallel is not None:
+            world.parallel.close()
+
+    return {
+        "result": result,
+        "created": world.compteur_creation,
+        "arrived": world.nb_lemmings_arrived,
+        "dead": world.nb_lemmings_dead,
+        "remaining": len(world.lemmings),
+        "ticks": tick,
+        "time_used": world.time / 10,
+        "wall_time": _time.perf_counter() - start,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulation d'une partie de Lemmings sans affichage.")
+    parser.add_argument("--ticks", type=int, default=None, help="nombre maximal de pas de simulation")
+    parser.add_argument("--lemmings", type=int, default=15, help="nombre de lemmings à créer")
+    parser.add_argument("--runs", type=int, default=1, help="nombre de parties à simuler")
+    parser.add_argument("--seed", type=int, default=None, help="graine du générateur aléatoire (la même pour chaque partie)")
+    parser.add_argument("--processes", type=int, default=None, help="nombre de processus de calcul (par défaut, un seul processus)")
+    args = parser.parse_args()
+
+    for _ in range(args.runs):
+        print(json.dumps(simulate(args.ticks, args.processes, nb_lemmings=args.lemmings, seed=args.seed)))
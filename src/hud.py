@@ -0,0 +1,159 @@
+"""
+Ce module affiche les textes de l'interface (statistiques de la partie, état sélectionné).
+
+Les polices ne sont chargées qu'une fois, et les textes déjà rendus sont gardés dans un
+cache borné (les moins récemment utilisés sont oubliés en premier). Chaque texte n'est
+redessiné que lorsque sa valeur change, ou lorsque l'affichage a effacé la zone où il se
+trouve (un lemming passé dessous, par exemple ; voir DirtyRenderer dans src/render.py).
+
+Classes :
+- TextWidget : Un texte de l'interface, redessiné seulement si nécessaire.
+- Hud : Les textes affichés pendant la partie.
+
+Fonctions :
+- get_font(size) : Retourne la police par défaut à la taille donnée, chargée une seule fois.
+- render_text(text, color, size) : Retourne la surface d'un texte, rendue une seule fois.
+
+Constantes :
+- FONT_SIZE : La taille de la police de l'interface.
+- TEXT_CACHE_SIZE : Le nombre maximal de textes rendus gardés en cache.
+"""
+
+import functools
+import pygame
+
+from src.constants import WHITE
+
+FONT_SIZE = 36
+TEXT_CACHE_SIZE = 512
+
+
+@functools.lru_cache(maxsize=None)
+def get_font(size):
+    """
+    Retourne la police par défaut à la taille donnée, chargée une seule fois.
+
+    Paramètres :
+    - size : La taille de la police.
+
+    Retourne :
+    Un objet pygame.font.Font.
+    """
+    return pygame.font.Font(None, size)
+
+
+@functools.lru_cache(maxsize=TEXT_CACHE_SIZE)
+def render_text(text, color=WHITE, size=FONT_SIZE):
+    """
+    Retourne la surface d'un texte, rendue une seule fois tant qu'elle reste dans le cache.
+
+    La surface est partagée entre tous les appels : elle ne doit pas être modifiée.
+
+    Paramètres :
+    - text : Le texte à afficher.
+    - color : Un tuple représentant la couleur du texte.
+    - size : La taille de la police.
+
+    Retourne :
+    Une surface Pygame.
+    """
+    return get_font(size).render(text, True, color)
+
+
+class TextWidget:
+    """
+    Un texte de l'interface, redessiné seulement si nécessaire.
+
+    Attributs :
+    - pos : Un tuple (x, y) représentant la position du coin haut gauche du texte.
+    - color : Un tuple représentant la couleur du texte.
+    - text : Le texte actuel.
+    - rect : Le pygame.Rect du texte affiché à l'écran, ou None s'il n'a jamais été dessiné.
+    - changed : Vrai si le texte a changé depuis qu'il a été dessiné.
+    """
+
+    def __init__(self, pos, color=WHITE):
+        self.pos = pos
+        self.color = color
+        self.text = None
+        self.rect = None
+        self.changed = True
+
+    def set(self, text, renderer):
+        """
+        Change le texte. L'ancien texte sera effacé à la prochaine image.
+
+        Paramètres :
+        - text : Le nouveau texte.
+        - renderer : L'affichage (voir DirtyRenderer).
+        """
+        if text != self.text:
+            self.text = text
+            self.changed = True
+            renderer.damage(self.rect)
+
+    def draw(self, screen, renderer):
+        """
+        Dessine le texte s'il a changé ou si sa zone a été effacée.
+
+        Paramètres :
+        - screen : L'objet d'écran Pygame.
+        - renderer : L'affichage (voir DirtyRenderer).
+        """
+        if self.changed or renderer.is_dirty(self.rect):
+            self.rect = screen.blit(render_text(self.text, self.color), self.pos)
+            renderer.mark(self.rect, keep=True)
+            self.changed = False
+
+
+class Hud:
+    """
+    Les textes affichés pendant la partie : pourcentage de lemmings sauvés, lemmings en jeu,
+    temps restant, état sélectionné et vitesse de la simulation (seulement en accéléré).
+
+    Une image se dessine en deux temps : update (avant DirtyRenderer.begin) donne aux textes
+    leur nouvelle valeur, puis draw (après begin) redessine ceux qui en ont besoin.
+
+    Paramètres :
+    - size : Un tuple (largeur, hauteur) représentant la taille de la fenêtre.
+    """
+
+    def __init__(self, size):
+        width, height = size
+        self.percentage = TextWidget((80, height - 40))  # Position en bas à gauche
+        self.nb_lemmings = TextWidget((width - 150, height - 40))  # Position en bas à droite
+        self.time = TextWidget((width - 170, 20))  # Position en haut à droite
+        self.state = TextWidget((30, height - 80))  # Position en bas au centre
+        self.speed = TextWidget((20, 20))  # Position en haut à gauche
+        self.widgets = [self.percentage, self.nb_lemmings, self.time, self.state, self.speed]
+
+    def update(self, renderer, world, selected_state, speed=1):
+        """
+        Met à jour la valeur des textes.
+
+        Paramètres :
+        - renderer : L'affichage (voir DirtyRenderer).
+        - world : Le monde du jeu.
+        - selected_state : Le nom de l'état sélectionné.
+        - speed : Le multiplicateur de vitesse de la simulation (voir src/timestep.py).
+        """
+        self.percentage.set("IN {:.0f}%".format((world.nb_lemmings_arrived / world.nb_lemmings) * 100), renderer)
+        self.nb_lemmings.set("OUT {}".format(len(world.lemmings)), renderer)
+        # Show the time format : MINUTES-SECONDS left
+        time_left = world.time_left()
+        minutes = int(time_left / 60)
+        seconds = int(time_left % 60)
+        self.time.set("TIME {:01d}-{:02d}".format(minutes, seconds), renderer)
+        self.state.set("State: {}".format(selected_state), renderer)
+        self.speed.set("x{}".format(speed) if speed != 1 else "", renderer)
+
+    def draw(self, screen, renderer):
+        """
+        Redessine les textes qui ont changé ou dont la zone a été effacée.
+
+        Paramètres :
+        - screen : L'objet d'écran Pygame.
+        - renderer : L'affichage (voir DirtyRenderer).
+        """
+        for widget in self.widgets:
+            widget.draw(screen, renderer)
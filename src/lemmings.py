@@ -0,0 +1,214 @@
+"""
+Ce module implémente le stockage des lemmings en colonnes NumPy (structure de tableaux).
+
+Chaque information d'un lemming (position, vitesse, état, ...) est une colonne : le lemming
+numéro i est décrit par la case i de chaque colonne. Les actions et les transitions peuvent
+ainsi traiter d'un seul coup tous les lemmings d'un même état.
+
+L'indice d'un lemming change quand des lemmings qui le précèdent quittent le jeu. Pour le
+retrouver plus tard, chaque lemming reçoit aussi un repère stable (handle) : une place dans un
+réservoir de places réutilisées, et le numéro de génération de cette place. Une place libérée
+change de génération, si bien qu'un repère périmé ne désigne jamais le lemming suivant.
+
+Classes :
+- Lemmings : Les colonnes décrivant les lemmings en jeu.
+
+Constantes :
+- COLUMNS : La liste des colonnes (nom, type NumPy).
+- HANDLE_SHIFT : Le nombre de bits de la place dans un repère ; les bits suivants portent la génération.
+- RECORD : Le type NumPy d'un lemming sous forme d'enregistrement compact (toutes les colonnes,
+  petit-boutiste), utilisé pour les sauvegardes (voir src/savestate.py).
+"""
+
+import numpy as np
+
+COLUMNS = (
+    ("id", np.int32),             # numéro de création du lemming, qui ne change jamais
+    ("x", np.int32),
+    ("y", np.int32),
+    ("prev_x", np.int32),         # position au pas précédent (interpolation de l'affichage)
+    ("prev_y", np.int32),
+    ("vx", np.int32),
+    ("etat", np.int8),
+    ("fallcount", np.int32),
+    ("decal", np.int32),
+    ("creuser_timer", np.int32),
+    ("w", np.int32),              # largeur du sprite courant (boîte de collision)
+    ("h", np.int32),              # hauteur du sprite courant (boîte de collision)
+    ("anim", np.int32),           # animation courante (voir World.frames)
+    ("frame", np.int32),          # image courante dans l'animation
+    ("dead_no_anim", np.bool_),
+    ("in_speed", np.bool_),
+)
+
+HANDLE_SHIFT = 32
+RECORD = np.dtype([(name, np.dtype(dtype).newbyteorder("<")) for name, dtype in COLUMNS])
+
+
+class Lemmings:
+    """
+    Les colonnes décrivant les lemmings en jeu.
+
+    Les colonnes sont accessibles comme attributs (lemmings.x, lemmings.etat, ...). Ce sont
+    des vues de longueur len(lemmings) sur des tableaux préalloués : elles doivent être relues
+    après un ajout ou une suppression.
+
+    Les colonnes et les places des repères sont préallouées et réutilisées : un ajout n'alloue
+    de mémoire que lorsque la capacité double. Les suppressions sont groupées (voir keep) :
+    elles ne déplacent aucun lemming pendant qu'une étape parcourt les indices.
+    """
+
+    def __init__(self, capacity=64):
+        self.n = 0
+        self._data = {name: np.zeros(capacity, dtype) for name, dtype in COLUMNS}
+        # Place de chaque ligne, ligne de chaque place (-1 si libre) et génération de chaque place
+        self._slot_of_row = np.zeros(capacity, np.int64)
+        self._row_of_slot = np.full(capacity, -1, np.int64)
+        self._generation = np.zeros(capacity, np.int64)
+        # Places libres, la prochaine à la fin
+        self._free = list(range(capacity - 1, -1, -1))
+        self._sync()
+
+    def __len__(self):
+        return self.n
+
+    def _sync(self):
+        """
+        Met à jour les vues des colonnes après un changement du nombre de lemmings.
+        """
+        for name, arr in self._data.items():
+            setattr(self, name, arr[:self.n])
+
+    def _reserve(self, capacity):
+        """
+        Agrandit les colonnes (en doublant leur taille) pour contenir au moins capacity lemmings.
+
+        Paramètres :
+        - capacity : Le nombre de lemmings à pouvoir stocker.
+        """
+        size = len(self._data["x"])
+        if capacity <= size:
+            return
+        while size < capacity:
+            size *= 2
+        for name, arr in self._data.items():
+            grown = np.zeros(size, arr.dtype)
+            grown[:self.n] = arr[:self.n]
+            self._data[name] = grown
+        old = len(self._row_of_slot)
+        self._slot_of_row = np.concatenate((self._slot_of_row, np.zeros(size - old, np.int64)))
+        self._row_of_slot = np.concatenate((self._row_of_slot, np.full(size - old, -1, np.int64)))
+        self._generation = np.concatenate((self._generation, np.zeros(size - old, np.int64)))
+        self._free[:0] = range(size - 1, old - 1, -1)
+
+    def add(self, **values):
+        """
+        Ajoute un lemming.
+
+        Paramètres :
+        - values : La valeur de chaque colonne ; les colonnes absentes valent 0.
+
+        Retourne :
+        L'indice du nouveau lemming.
+        """
+        self._reserve(self.n + 1)
+        i = self.n
+        for name, arr in self._data.items():
+            arr[i] = values.get(name, 0)
+        slot = self._free.pop()
+        self._slot_of_row[i] = slot
+        self._row_of_slot[slot] = i
+        self.n += 1
+        self._sync()
+        return i
+
+    def keep(self, mask):
+        """
+        Conserve uniquement les lemmings sélectionnés, dans le même ordre.
+
+        Toutes les suppressions d'un pas sont faites en une fois, en un seul parcours des
+        colonnes, quel que soit le nombre de lemmings supprimés. L'ordre est conservé (et non
+        celui d'une suppression par échange avec le dernier) : il décide de l'ordre de
+        traitement des lemmings, dont dépend la partie (voir actionSpeeder dans src/world.py).
+
+        Paramètres :
+        - mask : Un tableau de booléens de longueur len(self), vrai pour les lemmings à garder.
+        """
+        k = int(np.count_nonzero(mask))
+        if k == self.n:
+            return
+        freed = self._slot_of_row[:self.n][~mask]
+        self._generation[freed] += 1
+        self._row_of_slot[freed] = -1
+        self._free.extend(freed[::-1].tolist())
+        for arr in self._data.values():
+            arr[:k] = arr[:self.n][mask]
+        self._slot_of_row[:k] = self._slot_of_row[:self.n][mask]
+        self._row_of_slot[self._slot_of_row[:k]] = np.arange(k)
+        self.n = k
+        self._sync()
+
+    def records(self):
+        """
+        Retourne tous les lemmings sous forme d'enregistrements compacts.
+
+        Retourne :
+        Un nouveau tableau NumPy de type RECORD, de longueur len(self).
+        """
+        records = np.empty(self.n, RECORD)
+        for name, _ in COLUMNS:
+            records[name] = self._data[name][:self.n]
+        return records
+
+    def load_records(self, records):
+        """
+        Remplace tous les lemmings par des enregistrements compacts, colonne par colonne.
+
+        Les lemmings chargés reçoivent de nouveaux repères (voir handle).
+
+        Paramètres :
+        - records : Un tableau NumPy de type RECORD (par exemple lu par np.frombuffer).
+        """
+        n = len(records)
+        self.n = 0
+        self._reserve(n)
+        for name, _ in COLUMNS:
+            self._data[name][:n] = records[name]
+        capacity = len(self._row_of_slot)
+        self._generation += 1
+        self._slot_of_row[:n] = np.arange(n)
+        self._row_of_slot[:] = -1
+        self._row_of_slot[:n] = np.arange(n)
+        self._free = list(range(capacity - 1, n - 1, -1))
+        self.n = n
+        self._sync()
+
+    def handle(self, i):
+        """
+        Retourne le repère stable d'un lemming.
+
+        Paramètres :
+        - i : L'indice du lemming.
+
+        Retourne :
+        Un entier, valable tant que le lemming reste en jeu (voir resolve).
+        """
+        slot = int(self._slot_of_row[i])
+        return int(self._generation[slot]) << HANDLE_SHIFT | slot
+
+    def resolve(self, handle):
+        """
+        Retrouve l'indice actuel d'un lemming à partir de son repère, en temps constant.
+
+        Paramètres :
+        - handle : Un repère donné par handle.
+
+        Retourne :
+        L'indice du lemming, ou None s'il n'est plus en jeu.
+        """
+        handle = int(handle)
+        slot = handle & ((1 << HANDLE_SHIFT) - 1)
+        if slot >= len(self._generation) or self._generation[slot] != handle >> HANDLE_SHIFT:
+            return None
+        row = int(self._row_of_slot[slot])
+        return row if row >= 0 else None
@@ -0,0 +1,301 @@
+"""
+Ce module lit et écrit les fichiers de niveau (.lvl).
+
+Un fichier de niveau regroupe tout ce qui décrit un niveau : l'image du décor, la position
+d'apparition des lemmings, celle de la sortie, le nombre de lemmings, le temps imparti, les
+actions proposées au joueur, ainsi que les grilles de collision précalculées (pixels pleins
+et pixels de la sortie). Le chargement ne parcourt
+donc aucun pixel : le fichier est projeté en mémoire (mmap) et chaque section est utilisée
+directement, sans copie pour l'image du décor.
+
+Structure d'un fichier :
+- LEVEL_MAGIC, puis deux entiers de 32 bits (version, longueur de l'en-tête) ;
+- un en-tête JSON (métadonnées et position de chaque section) ;
+- les sections, alignées sur SECTION_ALIGN octets : "image" (pixels RGBX), "solid" et
+  "decor" (grilles de booléens, 8 pixels par octet).
+
+Utilisation en ligne de commande (compile le niveau d'origine, à partir de map.png) :
+
+    python -m src.level build
+
+Classes :
+- Level : Un niveau chargé en mémoire.
+
+Fonctions :
+- level_path(name) : Retourne le chemin du fichier d'un niveau.
+- list_levels() : Retourne les noms des niveaux disponibles.
+- load_level(name) : Charge un niveau par son nom.
+
+Constantes :
+- LEVEL_MAGIC : Les premiers octets d'un fichier de niveau.
+- LEVEL_VERSION : Le numéro du format des fichiers de niveau.
+- LEVEL_EXTENSION : L'extension des fichiers de niveau.
+- SECTION_ALIGN : L'alignement (en octets) des sections dans le fichier.
+- DEFAULT_LEVEL : Le nom du niveau chargé par défaut.
+- DEFAULT_SKILLS : Les actions proposées par défaut, dans l'ordre de la barre d'actions.
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import numpy as np
+import pygame
+
+from src.constants import levels
+from src.terrain import Terrain
+from src.world import (
+    World,
+    EtatStop,
+    EtatDead,
+    EtatMiner,
+    EtatMinerHorizontal,
+    EtatSpeeder,
+    EtatMinerDiagonal,
+    EtatFloater,
+    EtatBomber,
+)
+
+LEVEL_MAGIC = b"LEMLVL\0\0"
+LEVEL_VERSION = 2
+LEVEL_EXTENSION = ".lvl"
+SECTION_ALIGN = 64
+DEFAULT_LEVEL = "default"
+DEFAULT_SKILLS = (
+    EtatSpeeder,
+    EtatDead,
+    EtatStop,
+    EtatFloater,
+    EtatMinerDiagonal,
+    EtatDead,
+    EtatMinerHorizontal,
+    EtatMiner,
+    EtatBomber,
+)
+
+_HEADER = struct.Struct("<8sII")
+
+
+def _align(offset):
+    """
+    Arrondit une position dans le fichier au multiple de SECTION_ALIGN suivant.
+    """
+    return -(-offset // SECTION_ALIGN) * SECTION_ALIGN
+
+
+def level_path(name):
+    """
+    Retourne le chemin du fichier d'un niveau.
+
+    Paramètres :
+    - name : Le nom du niveau (le nom du fichier dans assets/levels, sans extension).
+
+    Retourne :
+    Une chaîne.
+    """
+    return os.path.join(levels, name + LEVEL_EXTENSION)
+
+
+def list_levels():
+    """
+    Retourne les noms des niveaux disponibles dans assets/levels, par ordre alphabétique.
+
+    Retourne :
+    Une liste de chaînes (vide si le répertoire n'existe pas).
+    """
+    if not os.path.isdir(levels):
+        return []
+    return sorted(name[:-len(LEVEL_EXTENSION)] for name in os.listdir(levels) if name.endswith(LEVEL_EXTENSION))
+
+
+def load_level(name=DEFAULT_LEVEL):
+    """
+    Charge un niveau par son nom.
+
+    Paramètres :
+    - name : Le nom du niveau (voir list_levels).
+
+    Retourne :
+    Un nouvel objet Level.
+    """
+    return Level.load(level_path(name))
+
+
+class Level:
+    """
+    Un niveau chargé en mémoire.
+
+    Le décor `fond` est modifié par le creusage pendant la partie : un objet Level ne sert qu'à
+    une seule partie. Pour rejouer le niveau, il suffit de le recharger, ce qui ne coûte qu'une
+    projection du fichier en mémoire.
+
+    Attributs :
+    - name : Le nom du niveau.
+    - fond : La surface Pygame du décor.
+    - spawn : Un tuple (x, y) représentant la position d'apparition des lemmings.
+    - exit_pos : Un tuple (x, y) représentant la position de la sortie.
+    - exit_image : Le nom de l'image de la sortie, dans assets/img.
+    - nb_lemmings : Le nombre de lemmings à créer.
+    - time_limit : Le temps imparti en secondes.
+    - skills : Les codes des actions proposées au joueur, dans l'ordre de la barre d'actions.
+    - solid, decor : Les grilles d'occupation précalculées (voir src/terrain.py).
+    """
+
+    def __init__(self, name, fond, spawn, exit_pos, exit_image, nb_lemmings, time_limit, skills, solid, decor):
+        self.name = name
+        self.fond = fond
+        self.spawn = tuple(spawn)
+        self.exit_pos = tuple(exit_pos)
+        self.exit_image = exit_image
+        self.nb_lemmings = nb_lemmings
+        self.time_limit = time_limit
+        self.skills = tuple(skills)
+        self.solid = solid
+        self.decor = decor
+
+    @classmethod
+    def compile(cls, name, fond, sortie, spawn, exit_pos, nb_lemmings, time_limit, skills=DEFAULT_SKILLS, exit_image="sortie.png"):
+        """
+        Construit un niveau à partir de ses images, en calculant les données de collision.
+
+        Paramètres :
+        - name : Le nom du niveau.
+        - fond : La surface Pygame du décor.
+        - sortie : La surface Pygame de la sortie, dont les pixels servent de sol.
+        - spawn, exit_pos, nb_lemmings, time_limit, skills, exit_image : Voir Level.
+
+        Retourne :
+        Un nouvel objet Level.
+        """
+        terrain = Terrain.from_surface(fond)
+        terrain.add_decor(sortie, exit_pos)
+        return cls(name, fond, spawn, exit_pos, exit_image, nb_lemmings, time_limit, skills, terrain.solid, terrain.decor)
+
+    def save(self, path):
+        """
+        Écrit le niveau dans un fichier.
+
+        Paramètres :
+        - path : Le chemin du fichier.
+        """
+        width, height = self.fond.get_size()
+        sections = [
+            ("image", pygame.image.tobytes(self.fond, "RGBX")),
+            ("solid", np.packbits(self.solid, axis=1).tobytes()),
+            ("decor", np.packbits(self.decor, axis=1).tobytes()),
+        ]
+        header = {
+            "name": self.name,
+            "width": width,
+            "height": height,
+            "spawn": self.spawn,
+            "exit_pos": self.exit_pos,
+            "exit_image": self.exit_image,
+            "nb_lemmings": self.nb_lemmings,
+            "time_limit": self.time_limit,
+            "skills": [int(etat) for etat in self.skills],
+        }
+        # La position des sections dépend de la longueur de l'en-tête, qui la contient :
+        # l'en-tête est réservé avec une marge, puis complété d'espaces
+        reserved = _align(_HEADER.size + len(json.dumps(header)) + 64 * len(sections) + SECTION_ALIGN)
+        offset = reserved
+        header["sections"] = {}
+        for section, data in sections:
+            header["sections"][section] = [offset, len(data)]
+            offset = _align(offset + len(data))
+        encoded = json.dumps(header).encode()
+        encoded += b" " * (reserved - _HEADER.size - len(encoded))
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(LEVEL_MAGIC, LEVEL_VERSION, len(encoded)))
+            f.write(encoded)
+            for section, data in sections:
+                f.seek(header["sections"][section][0])
+                f.write(data)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Charge un niveau écrit par save, en projetant le fichier en mémoire.
+
+        La projection est privée : le creusage modifie l'image du décor en mémoire, jamais le fichier.
+
+        Paramètres :
+        - path : Le chemin du fichier.
+
+        Retourne :
+        Un nouvel objet Level.
+        """
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        magic, version, length = _HEADER.unpack_from(data)
+        if magic != LEVEL_MAGIC:
+            raise ValueError("{} n'est pas un fichier de niveau".format(path))
+        if version != LEVEL_VERSION:
+            raise ValueError("Format de niveau non supporté : {}".format(version))
+        header = json.loads(bytes(data[_HEADER.size:_HEADER.size + length]))
+        width, height = header["width"], header["height"]
+        view = memoryview(data)
+
+        def section(name):
+            offset, size = header["sections"][name]
+            return view[offset:offset + size]
+
+        # La surface utilise directement la mémoire projetée (qu'elle garde en vie). Le décor
+        # est opaque : sans canal alpha, il est recopié à l'écran sans mélange, bien plus vite
+        fond = pygame.image.frombuffer(section("image"), (width, height), "RGBX")
+
+        def bitmap(name):
+            packed = np.frombuffer(section(name), np.uint8).reshape(height, -1)
+            return np.unpackbits(packed, axis=1, count=width).view(bool)
+
+        return cls(
+            header["name"], fond, header["spawn"], header["exit_pos"], header["exit_image"],
+            header["nb_lemmings"], header["time_limit"], header["skills"],
+            bitmap("solid"), bitmap("decor"),
+        )
+
+    def terrain(self):
+        """
+        Retourne la grille d'occupation du niveau, construite à partir des données précalculées.
+
+        Retourne :
+        Un nouvel objet Terrain, indépendant du niveau.
+        """
+        return Terrain(self.solid.copy(), self.decor.copy())
+
+    def world(self, sortie, animations, seed=None):
+        """
+        Crée le monde d'une partie sur ce niveau.
+
+        Paramètres :
+        - sortie : La surface Pygame de la sortie (l'image exit_image).
+        - animations : Les animations des lemmings (voir src/sprites.py).
+        - seed : La graine du générateur aléatoire de la partie (tirée au hasard par défaut).
+
+        Retourne :
+        Un nouvel objet World, qui modifie le décor du niveau.
+        """
+        return World(
+            self.fond, sortie, animations, spawn=self.spawn, exit_pos=self.exit_pos,
+            nb_lemmings=self.nb_lemmings, time_limit=self.time_limit, seed=seed, terrain=self.terrain(),
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compilation des niveaux de Lemmings.")
+    parser.add_argument("command", choices=["build"], help="build : compile le niveau d'origine à partir de map.png")
+    parser.add_argument("--name", default=DEFAULT_LEVEL, help="nom du niveau créé")
+    args = parser.parse_args()
+
+    from src.assets import Assets
+
+    assets = Assets()
+    level = Level.compile(
+        args.name, assets.image("map.png"), assets.image("sortie.png"),
+        spawn=(256, 125), exit_pos=(646, 250), nb_lemmings=15, time_limit=120,
+    )
+    level.save(level_path(args.name))
+    print("Niveau {} écrit dans {}".format(args.name, level_path(args.name)))
@@ -0,0 +1,270 @@
+"""
+Ce module répartit les transitions et les actions des lemmings entre plusieurs processus.
+
+Les lemmings actifs sont partagés en bandes verticales (des tranches d'abscisses contenant
+chacune à peu près autant de lemmings), une par processus de calcul. Le terrain est placé en
+mémoire partagée (voir Terrain.share) : tous les processus le lisent sans copie. Les colonnes
+des lemmings sont recopiées à chaque pas dans un bloc de mémoire partagée, où chaque processus
+ne modifie que les lignes de sa bande.
+
+Pendant un pas, le terrain est lu par les transitions et n'est modifié que par les actions :
+chaque processus note les formes à effacer (voir World.carve) au lieu de les effacer, et le
+processus principal les efface toutes à la fin du pas, une fois tous les processus terminés.
+Un effacement ne fait qu'enlever des pixels, l'ordre des effacements ne change donc pas le
+résultat. L'accélération (actionSpeeder), dont la limite dépend de l'ordre de tous les
+lemmings, reste dans le processus principal. La partie est identique, pas par pas, à celle
+simulée dans un seul processus (voir state_digest dans src/replay.py).
+
+Le mode parallèle est optionnel : pour quelques milliers de lemmings, les transitions
+calculées par NumPy coûtent à peine plus que l'échange des colonnes et l'attente des processus.
+
+Classes :
+- ParallelTick : Répartit les transitions et les actions d'un monde entre plusieurs processus.
+"""
+
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+from types import SimpleNamespace
+import numpy as np
+
+from src.lemmings import COLUMNS
+from src.terrain import Terrain
+from src.world import ActionToPerform, EtatSpeeder, perform_actions, update_states
+
+# Colonnes lues par les transitions et les actions, et celles qu'elles modifient
+_READ = ("x", "y", "w", "h", "vx", "etat", "fallcount", "creuser_timer", "dead_no_anim")
+_WRITTEN = ("x", "y", "vx", "etat", "fallcount", "creuser_timer")
+_LAYOUT = tuple((name, np.dtype(dtype)) for name, dtype in COLUMNS if name in _READ) + (("active", np.dtype(np.int64)),)
+
+# Les actions effectuées par les processus de calcul, dans l'ordre de World.actions
+_BAND_ETATS = tuple(etat for etat in ActionToPerform if etat != EtatSpeeder)
+
+
+class _SharedColumns:
+    """
+    Les colonnes des lemmings lues par les processus de calcul (et les indices des lemmings
+    actifs), dans un seul bloc de mémoire partagée.
+
+    Paramètres :
+    - block : Le bloc de mémoire partagée (multiprocessing.shared_memory.SharedMemory).
+    - capacity : Le nombre de lemmings que peut contenir chaque colonne.
+    """
+
+    def __init__(self, block, capacity):
+        self.block = block
+        self.capacity = capacity
+        self.arrays = {}
+        offset = 0
+        for name, dtype in _LAYOUT:
+            self.arrays[name] = np.ndarray(capacity, dtype, buffer=block.buf, offset=offset)
+            # Chaque colonne commence sur un multiple de 8 octets
+            offset += -(-capacity * dtype.itemsize // 8) * 8
+
+    @classmethod
+    def create(cls, capacity):
+        """
+        Crée le bloc de mémoire partagée pour capacity lemmings.
+        """
+        size = sum(-(-capacity * dtype.itemsize // 8) * 8 for _, dtype in _LAYOUT)
+        return cls(shared_memory.SharedMemory(create=True, size=size), capacity)
+
+    @property
+    def spec(self):
+        """
+        La description du bloc, à transmettre aux processus de calcul.
+        """
+        return self.block.name, self.capacity
+
+    @classmethod
+    def attach(cls, spec):
+        """
+        Ouvre, dans un processus de calcul, un bloc créé par create.
+        """
+        name, capacity = spec
+        return cls(shared_memory.SharedMemory(name=name), capacity)
+
+    def lemmings(self, n):
+        """
+        Retourne les colonnes des n premiers lemmings, comme attributs (à la manière de Lemmings).
+        """
+        return SimpleNamespace(**{name: self.arrays[name][:n] for name in _READ})
+
+    def close(self, unlink=False):
+        """
+        Ferme le bloc ; les colonnes ne doivent plus être utilisées.
+        """
+        self.arrays = {}
+        self.block.close()
+        if unlink:
+            self.block.unlink()
+
+
+class _Band:
+    """
+    Le monde vu par un processus de calcul : le terrain partagé, les colonnes partagées des
+    lemmings et l'union des lemmings arrêtés. Les formes à effacer sont notées, pas effacées.
+    """
+
+    def __init__(self, terrain):
+        self.terrain = terrain
+        self.lemmings = None
+        self.blockers = None
+        self.events = []
+        self.carves = []
+
+    def carve(self, stamp, xs, ys):
+        """
+        Note une forme à effacer par le processus principal à la fin du pas (voir World.carve).
+        """
+        self.carves.append((stamp, np.atleast_1d(xs), np.atleast_1d(ys)))
+
+
+def _work(conn, terrain_spec):
+    """
+    Boucle d'un processus de calcul : traite sa bande à chaque message reçu, jusqu'à recevoir None.
+
+    Un message est un tuple (colonnes, blockers, n, start, stop) : la description d'un
+    nouveau bloc de colonnes ou None, la nouvelle union des lemmings arrêtés ou None, le
+    nombre de lemmings et la partie [start, stop[ des indices actifs qui forme la bande. La
+    réponse est le tuple (formes à effacer, événements sonores).
+
+    Paramètres :
+    - conn : L'extrémité du multiprocessing.Pipe reliée au processus principal.
+    - terrain_spec : La description du terrain partagé (voir Terrain.share).
+    """
+    band = _Band(Terrain.attach(terrain_spec))
+    columns = None
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        spec, blockers, n, start, stop = message
+        if spec is not None:
+            band.lemmings = None
+            if columns is not None:
+                columns.close()
+            columns = _SharedColumns.attach(spec)
+        if blockers is not None:
+            band.blockers = blockers
+        band.lemmings = columns.lemmings(n)
+        # Copie : les indices partagés seront réécrits au pas suivant
+        idx = columns.arrays["active"][start:stop].copy()
+        update_states(band, idx)
+        perform_actions(band, idx, _BAND_ETATS)
+        conn.send((band.carves, band.events))
+        band.carves, band.events = [], []
+    band.lemmings = None
+    if columns is not None:
+        columns.close()
+
+
+def _split_bands(active, xs, bands):
+    """
+    Répartit des lemmings en bandes verticales contenant à peu près autant de lemmings.
+
+    Paramètres :
+    - active : Les indices des lemmings, croissants.
+    - xs : Leurs abscisses.
+    - bands : Le nombre de bandes.
+
+    Retourne :
+    Un tuple (indices, limites) : les indices regroupés par bande, de gauche à droite (dans
+    l'ordre croissant à l'intérieur d'une bande), et les bands + 1 limites des bandes dans ce tableau.
+    """
+    if bands == 1:
+        return active, [0, active.size]
+    kth = [xs.size * k // bands for k in range(1, bands)]
+    band = np.searchsorted(np.partition(xs, kth)[kth], xs, side="right")
+    order = np.argsort(band, kind="stable")
+    limits = np.concatenate(([0], np.cumsum(np.bincount(band, minlength=bands))))
+    return active[order], limits.tolist()
+
+
+class ParallelTick:
+    """
+    Répartit les transitions et les actions d'un monde entre plusieurs processus.
+
+    Une fois créé, l'objet s'attache au monde (World.parallel) : World.step lui confie les
+    transitions et les actions, jusqu'à l'appel de close.
+
+    Paramètres :
+    - world : Le monde du jeu.
+    - processes : Le nombre de processus de calcul (par défaut, le nombre de processeurs).
+    """
+
+    def __init__(self, world, processes=None):
+        self.world = world
+        self.processes = processes or os.cpu_count() or 1
+        self._columns = None
+        self._blockers = None
+        terrain_spec = world.terrain.share()
+        self._pipes = []
+        self._workers = []
+        for _ in range(self.processes):
+            parent, child = multiprocessing.Pipe()
+            worker = multiprocessing.Process(target=_work, args=(child, terrain_spec), daemon=True)
+            worker.start()
+            child.close()
+            self._pipes.append(parent)
+            self._workers.append(worker)
+        world.parallel = self
+
+    def step(self):
+        """
+        Effectue les transitions (ETAPE 1) et les actions (ETAPE 2) d'un pas de simulation.
+        """
+        world = self.world
+        L = world.lemmings
+        with world.profiler.phase("transitions"):
+            active = world.remove_finished()
+            if not active.size:
+                return
+            n = len(L)
+            spec = None
+            if self._columns is None or self._columns.capacity < n:
+                if self._columns is not None:
+                    self._columns.close(unlink=True)
+                self._columns = _SharedColumns.create(max(n, world.nb_lemmings))
+                spec = self._columns.spec
+            arrays = self._columns.arrays
+            for name in _READ:
+                arrays[name][:n] = getattr(L, name)
+            # Les bandes sont formées avant que les lemmings ne bougent : chacun est traité
+            # par un seul processus
+            grouped, limits = _split_bands(active, L.x[active], self.processes)
+            arrays["active"][:grouped.size] = grouped
+            blockers = None
+            if world.blockers is not self._blockers:
+                blockers = self._blockers = world.blockers
+            for pipe, start, stop in zip(self._pipes, limits, limits[1:]):
+                pipe.send((spec, blockers, n, start, stop))
+            # Barrière : tous les processus ont terminé leur bande
+            results = [pipe.recv() for pipe in self._pipes]
+
+        with world.profiler.phase("actions"):
+            for name in _WRITTEN:
+                getattr(L, name)[:] = arrays[name][:n]
+            for carves, events in results:
+                world.events.extend(events)
+                for stamp, xs, ys in carves:
+                    world.carve(stamp, xs, ys)
+            perform_actions(world, active, (EtatSpeeder,))
+
+    def close(self):
+        """
+        Arrête les processus de calcul et libère la mémoire partagée ; le monde reprend la
+        simulation dans un seul processus.
+        """
+        for pipe in self._pipes:
+            pipe.send(None)
+        for worker in self._workers:
+            worker.join()
+        for pipe in self._pipes:
+            pipe.close()
+        self._pipes, self._workers = [], []
+        if self._columns is not None:
+            self._columns.close(unlink=True)
+            self._columns = None
+        self.world.terrain.unshare()
+        self.world.parallel = None
@@ -0,0 +1,302 @@
+"""
+Ce module mesure la durée de chaque phase de la boucle de jeu.
+
+Les phases (événements, transitions, actions, affichage, interface, envoi à l'écran) sont
+chronométrées image par image lorsque le profileur est activé. Les mesures sont gardées pour
+un graphique affiché par-dessus le jeu (ProfilerOverlay), et peuvent être exportées en CSV ou
+en JSONL par un thread dédié : l'écriture sur le disque ne ralentit jamais la boucle.
+
+Le profileur compte aussi les appels aux fonctions de collision les plus utilisées de
+src/world.py. Elles ne sont remplacées par des versions comptées que pendant l'activation :
+désactivé, le profileur ne coûte qu'un appel de méthode par phase.
+
+Classes :
+- Profiler : Chronomètre les phases de la boucle de jeu et compte les appels.
+- ProfilerOverlay : Affiche l'historique des mesures sous forme de graphique.
+
+Constantes :
+- PHASES : Les phases chronométrées, dans l'ordre de la boucle de jeu.
+- PHASE_COLORS : La couleur de chaque phase dans le graphique.
+- HOT_HELPERS : Les fonctions de src/world.py dont les appels sont comptés.
+- HISTORY : Le nombre d'images gardées pour le graphique.
+- OVERLAY_REFRESH : Le nombre d'images entre deux mises à jour des moyennes affichées.
+"""
+
+import csv
+import json
+import queue
+import threading
+import time as _time
+from collections import deque
+import pygame
+
+from src.hud import get_font
+
+PHASES = ("events", "transitions", "actions", "render", "hud", "flip")
+PHASE_COLORS = {
+    "events": (120, 120, 120),
+    "transitions": (220, 80, 80),
+    "actions": (230, 170, 50),
+    "render": (80, 160, 230),
+    "hud": (150, 90, 210),
+    "flip": (80, 200, 120),
+}
+HOT_HELPERS = (
+    "check_if_lemming_can_fall",
+    "check_collision_lemming_wall",
+    "check_collision_lemming_stopped",
+    "is_on_exit",
+)
+HISTORY = 240
+OVERLAY_REFRESH = 30
+
+
+class _NoTimer:
+    """
+    Chronomètre qui ne fait rien, utilisé quand le profileur est désactivé.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_TIMER = _NoTimer()
+
+
+class _PhaseTimer:
+    """
+    Chronomètre d'une phase : ajoute la durée du bloc `with` au total de la phase dans l'image en cours.
+    """
+
+    def __init__(self, totals, name):
+        self.totals = totals
+        self.name = name
+
+    def __enter__(self):
+        self.start = _time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.totals[self.name] += _time.perf_counter() - self.start
+        return False
+
+
+def _write_records(records, path):
+    """
+    Écrit les mesures reçues dans un fichier, jusqu'à recevoir None (exécuté par un thread dédié).
+
+    Paramètres :
+    - records : La file (queue.Queue) des mesures à écrire.
+    - path : Le chemin du fichier ; le format est JSONL si son extension est .jsonl, CSV sinon.
+    """
+    with open(path, "w", newline="") as f:
+        if path.endswith(".jsonl"):
+            write = lambda record: f.write(json.dumps(record) + "\n")
+        else:
+            writer = csv.DictWriter(f, fieldnames=["frame", "tick", "ticks"] + list(PHASES) + list(HOT_HELPERS))
+            writer.writeheader()
+            write = writer.writerow
+        while True:
+            record = records.get()
+            if record is None:
+                return
+            write(record)
+
+
+class Profiler:
+    """
+    Chronomètre les phases de la boucle de jeu et compte les appels aux fonctions de collision.
+
+    Utilisation : chaque phase est entourée de `with profiler.phase(nom):`, puis end_frame est
+    appelé une fois par image.
+
+    Paramètres :
+    - export : Le chemin d'un fichier CSV ou JSONL où écrire les mesures de chaque image, ou None.
+
+    Attributs :
+    - enabled : Vrai si les mesures sont en cours.
+    - history : Les mesures des dernières images (dictionnaires, durées en millisecondes).
+    """
+
+    def __init__(self, export=None):
+        self.enabled = False
+        self.history = deque(maxlen=HISTORY)
+        self.export = export
+        self.frame = 0
+        self._totals = dict.fromkeys(PHASES, 0.0)
+        self._timers = {name: _PhaseTimer(self._totals, name) for name in PHASES}
+        self._calls = dict.fromkeys(HOT_HELPERS, 0)
+        self._originals = {}
+        self._records = None
+        self._writer = None
+
+    def phase(self, name):
+        """
+        Retourne le chronomètre d'une phase, à utiliser avec `with`.
+
+        Paramètres :
+        - name : Le nom de la phase (voir PHASES).
+        """
+        if not self.enabled:
+            return _NO_TIMER
+        return self._timers[name]
+
+    def enable(self):
+        """
+        Active les mesures, le comptage des appels et, si demandé, l'export.
+        """
+        if self.enabled:
+            return
+        self.enabled = True
+        self._install_counters()
+        if self.export is not None and self._writer is None:
+            self._records = queue.Queue()
+            self._writer = threading.Thread(
+                target=_write_records, args=(self._records, self.export), name="profiler-export", daemon=True
+            )
+            self._writer.start()
+
+    def disable(self):
+        """
+        Arrête les mesures et rend aux fonctions de collision leur version d'origine.
+        """
+        if not self.enabled:
+            return
+        self.enabled = False
+        self._remove_counters()
+
+    def toggle(self):
+        """
+        Active ou désactive les mesures.
+        """
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable()
+
+    def _install_counters(self):
+        """
+        Remplace les fonctions de HOT_HELPERS dans src/world.py par des versions qui comptent leurs appels.
+        """
+        import src.world as world_module
+
+        for name in HOT_HELPERS:
+            original = getattr(world_module, name)
+            self._originals[name] = original
+
+            def counted(*args, _name=name, _original=original):
+                self._calls[_name] += 1
+                return _original(*args)
+
+            setattr(world_module, name, counted)
+
+    def _remove_counters(self):
+        """
+        Remet en place les fonctions d'origine.
+        """
+        import src.world as world_module
+
+        for name, original in self._originals.items():
+            setattr(world_module, name, original)
+        self._originals = {}
+
+    def end_frame(self, tick, ticks):
+        """
+        Termine l'image en cours : enregistre ses mesures et remet les totaux à zéro.
+
+        Paramètres :
+        - tick : Le numéro du dernier pas de simulation effectué.
+        - ticks : Le nombre de pas de simulation effectués pendant l'image.
+        """
+        if not self.enabled:
+            return
+        self.frame += 1
+        record = {"frame": self.frame, "tick": tick, "ticks": ticks}
+        for name in PHASES:
+            record[name] = round(self._totals[name] * 1000, 4)
+            self._totals[name] = 0.0
+        record.update(self._calls)
+        for name in HOT_HELPERS:
+            self._calls[name] = 0
+        self.history.append(record)
+        if self._records is not None:
+            self._records.put(record)
+
+    def close(self):
+        """
+        Désactive les mesures et attend que toutes les mesures exportées soient écrites.
+        """
+        self.disable()
+        if self._writer is not None:
+            self._records.put(None)
+            self._writer.join()
+            self._writer = None
+            self._records = None
+
+
+class ProfilerOverlay:
+    """
+    Affiche l'historique des mesures sous forme de graphique : une colonne par image, dont
+    les segments colorés représentent la durée de chaque phase.
+
+    Le graphique est gardé dans une surface qui défile d'un pixel à chaque image : seule la
+    nouvelle colonne est dessinée.
+
+    Paramètres :
+    - pos : Un tuple (x, y) représentant la position du graphique sur l'écran.
+    - size : Un tuple (largeur, hauteur) du graphique, en pixels.
+    - scale : Le nombre de pixels par milliseconde.
+    """
+
+    def __init__(self, pos=(10, 60), size=(HISTORY, 80), scale=4):
+        self.rect = pygame.Rect(pos, size)
+        self.scale = scale
+        self._graph = pygame.Surface(size)
+        self._frame = None
+        self._labels = []
+
+    def draw(self, screen, profiler):
+        """
+        Dessine le graphique et la durée moyenne de chaque phase.
+
+        Paramètres :
+        - screen : L'objet d'écran Pygame.
+        - profiler : Le profileur dont l'historique est affiché.
+
+        Retourne :
+        La liste des pygame.Rect des zones dessinées.
+        """
+        if not profiler.history:
+            return []
+        last = profiler.history[-1]
+        if last["frame"] != self._frame:
+            self._frame = last["frame"]
+            width, height = self.rect.size
+            self._graph.scroll(-1, 0)
+            self._graph.fill((0, 0, 0), (width - 1, 0, 1, height))
+            bottom = height
+            for name in PHASES:
+                segment = min(bottom, int(round(last[name] * self.scale)))
+                if segment > 0:
+                    self._graph.fill(PHASE_COLORS[name], (width - 1, bottom - segment, 1, segment))
+                    bottom -= segment
+            # Les moyennes changent à chaque image : elles ne sont rendues que de temps en temps,
+            # sans passer par le cache des textes de l'interface
+            if not self._labels or self._frame % OVERLAY_REFRESH == 0:
+                font = get_font(18)
+                self._labels = [
+                    font.render(
+                        "{} {:.2f} ms".format(name, sum(record[name] for record in profiler.history) / len(profiler.history)),
+                        True, PHASE_COLORS[name],
+                    )
+                    for name in PHASES
+                ]
+        rects = [screen.blit(self._graph, self.rect)]
+        y = self.rect.bottom + 2
+        for label in self._labels:
+            rects.append(screen.blit(label, (self.rect.x, y)))
+            y += label.get_height()
+        return rects
@@ -0,0 +1,385 @@
+"""
+Ce module affiche le monde du jeu. Il ne fait que lire l'état du monde (voir src/world.py) :
+il peut être appelé moins souvent que la simulation, ou pas du tout, sans la modifier.
+
+DirtyRenderer ne redessine que les zones de l'écran qui ont changé depuis l'image
+précédente (lemmings, décor creusé, textes de l'interface) et ne transmet qu'elles à l'écran
+avec pygame.display.update, au lieu de tout redessiner et d'appeler pygame.display.flip.
+
+L'affichage pouvant être plus fréquent que la simulation (voir src/timestep.py), les
+lemmings peuvent être dessinés entre leur position au pas précédent et leur position
+actuelle (paramètre alpha), pour un mouvement fluide.
+
+Seule la zone de la carte vue par la caméra (voir src/camera.py) est dessinée : pour les
+lemmings hors de cette zone, ni le sprite n'est cherché ni le blit n'est fait. Leur image
+courante est tout de même choisie par la simulation (voir World.animate), car elle donne la
+taille de leur boîte de collision.
+
+Classes :
+- DirtyRenderer : Affichage par zones modifiées.
+
+Fonctions :
+- draw_world(screen, world, alpha, camera) : Dessine le décor, la sortie et les lemmings.
+- lemming_positions(world, alpha, idx) : Calcule la position d'affichage des lemmings.
+- visible_lemmings(world, xs, ys, view) : Sélectionne les lemmings visibles dans une zone de la carte.
+- draw_lemmings(screen, world, alpha, camera) : Dessine les lemmings visibles.
+- draw_hitbox(screen, world, lemming, alpha, camera, contact) : Dessine la boîte de collision d'un lemming sur l'écran.
+- draw_hitboxes(screen, world, alpha, camera) : Dessine la boîte de collision des lemmings visibles.
+- draw_highlight(screen, world, lemming, alpha, camera) : Encadre le lemming survolé par la souris.
+
+Constantes :
+- MAX_DIRTY_RECTS : Au-delà de ce nombre de zones modifiées, l'image est redessinée entièrement.
+"""
+
+import numpy as np
+import pygame
+
+from src.camera import Camera
+from src.constants import BLACK, GREEN, RED, WHITE
+from src.world import EtatChute, find_landing
+
+MAX_DIRTY_RECTS = 256
+
+
+def _view(world, camera):
+    """
+    Retourne la zone de la carte affichée : celle de la caméra, ou toute la carte.
+    """
+    return camera.rect if camera is not None else world.fond.get_rect()
+
+
+def draw_world(screen, world, alpha=None, camera=None):
+    """
+    Dessine le décor, la sortie et les lemmings.
+
+    Paramètres :
+    - screen : L'objet d'écran Pygame.
+    - world : Le monde du jeu.
+    - alpha : L'interpolation des positions des lemmings (voir lemming_positions).
+    - camera : La caméra (voir src/camera.py), ou None pour dessiner la carte entière en (0, 0).
+    """
+    view = _view(world, camera)
+    _draw_background(screen, world, view)
+
+    # ETAPE 3 : affichage des lemmings
+    draw_lemmings(screen, world, alpha, camera)
+
+
+def _draw_background(screen, world, view):
+    """
+    Dessine le décor et la sortie vus dans une zone de la carte.
+    """
+    # draw background
+    screen.blit(world.fond, (0, 0), view)
+    # Positionate the sortie
+    screen.blit(world.sortie, (world.exit_pos[0] - view.x, world.exit_pos[1] - view.y))
+
+
+def lemming_positions(world, alpha=None, idx=slice(None)):
+    """
+    Calcule la position d'affichage des lemmings.
+
+    Paramètres :
+    - world : Le monde du jeu.
+    - alpha : None pour la position actuelle, ou la fraction (entre 0 et 1) du chemin entre
+      la position au pas précédent et la position actuelle.
+    - idx : Les lemmings concernés (un indice ou un tableau d'indices), tous par défaut.
+
+    Retourne :
+    Un tuple (xs, ys) de tableaux NumPy d'entiers (d'entiers NumPy pour un seul indice).
+    """
+    L = world.lemmings
+    x, y = L.x[idx], L.y[idx]
+    if alpha is None:
+        return x, y
+    prev_x, prev_y = L.prev_x[idx], L.prev_y[idx]
+    xs = np.rint(prev_x + (x - prev_x) * alpha).astype(np.int32)
+    ys = np.rint(prev_y + (y - prev_y) * alpha).astype(np.int32)
+    return xs, ys
+
+
+def visible_lemmings(world, xs, ys, view):
+    """
+    Sélectionne les lemmings visibles dans une zone de la carte.
+
+    Paramètres :
+    - world : Le monde du jeu.
+    - xs, ys : Les positions d'affichage des lemmings (voir lemming_positions).
+    - view : Le pygame.Rect de la zone, en coordonnées de la carte.
+
+    Retourne :
+    Un tableau NumPy des indices des lemmings affichés (hors morts sans animation) qui touchent la zone.
+    """
+    L = world.lemmings
+    return np.flatnonzero(
+        ~L.dead_no_anim & (xs < view.right) & (xs + L.w > view.left) & (ys < view.bottom) & (ys + L.h > view.top)
+    )
+
+
+def _blit_lemmings(screen, world, idx, xs, ys, view):
+    """
+    Dessine les lemmings d'indices idx, décalés de la position de la zone affichée.
+
+    Les sprites sont lus dans la table à plat du monde (voir World.sprite_keys) et envoyés en
+    un seul appel à screen.blits.
+    """
+    sprites = world.sprites
+    screen.blits(
+        zip(map(sprites.__getitem__, world.sprite_keys(idx).tolist()),
+            zip((xs[idx] - view.x).tolist(), (ys[idx] - view.y).tolist())),
+        doreturn=False,
+    )
+
+
+def draw_lemmings(screen, world, alpha=None, camera=None):
+    """
+    Dessine les lemmings visibles.
+
+    Paramètres :
+    - screen : L'objet d'écran Pygame.
+    - world : Le monde du jeu.
+    - alpha : L'interpolation des positions (voir lemming_positions).
+    - camera : La caméra (voir src/camera.py), ou None pour la carte entière.
+    """
+    view = _view(world, camera)
+    xs, ys = lemming_positions(world, alpha)
+    _blit_lemmings(screen, world, visible_lemmings(world, xs, ys, view), xs, ys, view)
+
+
+def draw_hitbox(screen, world, lemming, alpha=None, camera=None, contact=False):
+    """
+    Dessine la boîte de collision d'un lemming sur l'écran, à sa position d'affichage.
+
+    Paramètres :
+    - screen : L'objet d'écran Pygame.
+    - world : Le monde du jeu.
+    - lemming : L'indice du lemming.
+    - alpha : L'interpolation des positions (voir lemming_positions).
+    - camera : La caméra (voir src/camera.py), ou None pour la carte entière.
+    - contact : Si vrai, la boîte est rouge : l'image du lemming touche le décor (voir World.terrain_contacts).
+
+    Retourne :
+    Le pygame.Rect de la zone dessinée.
+    """
+    L = world.lemmings
+    view = _view(world, camera)
+    x, y = lemming_positions(world, alpha, lemming)
+    xx = int(x) - view.x
+    yy = int(y) - view.y
+    width = L.w[lemming]  # Utiliser la largeur réelle de la surface
+    height = L.h[lemming]  # Hauteur de la surface du lemming
+    return pygame.draw.rect(screen, RED if contact else GREEN, (xx, yy, width, height), 1)
+
+
+def draw_hitboxes(screen, world, alpha=None, camera=None):
+    """
+    Dessine la boîte de collision des lemmings visibles, en rouge pour ceux dont l'image
+    touche le décor au pixel près.
+
+    Paramètres :
+    - screen : L'objet d'écran Pygame.
+    - world : Le monde du jeu.
+    - alpha : L'interpolation des positions (voir lemming_positions).
+    - camera : La caméra (voir src/camera.py), ou None pour la carte entière.
+
+    Retourne :
+    La liste des pygame.Rect des zones dessinées.
+    """
+    xs, ys = lemming_positions(world, alpha)
+    visible = visible_lemmings(world, xs, ys, _view(world, camera))
+    contacts = world.terrain_contacts(visible)
+    return [
+        draw_hitbox(screen, world, lemming, alpha, camera, contact)
+        for lemming, contact in zip(visible.tolist(), contacts.tolist())
+    ]
+
+
+def draw_highlight(screen, world, lemming, alpha=None, camera=None):
+    """
+    Encadre le lemming survolé par la souris : en rouge s'il tombe et que son arrivée au sol
+    sera mortelle (voir find_landing dans src/world.py).
+
+    Paramètres :
+    - screen : L'objet d'écran Pygame.
+    - world : Le monde du jeu.
+    - lemming : L'indice du lemming (voir World.lemming_at).
+    - alpha : L'interpolation des positions (voir lemming_positions).
+    - camera : La caméra (voir src/camera.py), ou None pour la carte entière.
+
+    Retourne :
+    Le pygame.Rect de la zone dessinée.
+    """
+    L = world.lemmings
+    view = _view(world, camera)
+    x, y = lemming_positions(world, alpha, lemming)
+    x, y = int(x) - view.x, int(y) - view.y
+    color = WHITE
+    if L.etat[lemming] == EtatChute and find_landing(world, [lemming])[1][0]:
+        color = RED
+    return pygame.draw.rect(screen, color, (x - 1, y - 1, L.w[lemming] + 2, L.h[lemming] + 2), 1)
+
+
+class DirtyRenderer:
+    """
+    Affichage par zones modifiées.
+
+    Une image se dessine en trois temps : begin efface les zones modifiées (en y recopiant le
+    décor et la sortie) puis dessine les lemmings, l'appelant dessine ensuite l'interface en
+    signalant chaque zone dessinée avec mark, et present envoie à l'écran les seules zones
+    modifiées. Une zone dessinée est effacée à l'image suivante, qu'elle soit redessinée ou non,
+    sauf si elle est marquée comme durable (textes de l'interface, voir src/hud.py) : elle
+    reste alors affichée jusqu'à ce qu'elle soit abîmée (is_dirty) ou effacée (damage).
+
+    Les zones sont en coordonnées de l'écran. Quand la caméra bouge, l'image est redessinée
+    entièrement : seule la zone vue par la caméra est lue dans le décor.
+
+    Attributs :
+    - screen : L'objet d'écran Pygame.
+    - world : Le monde du jeu.
+    - camera : La caméra (voir src/camera.py). Par défaut, une caméra de la taille de l'écran.
+    """
+
+    def __init__(self, screen, world, camera=None):
+        self.screen = screen
+        self.world = world
+        self.camera = camera if camera is not None else Camera(screen.get_size(), world.fond.get_size())
+        self._view = None
+        self._previous = []
+        self._damaged = []
+        self._kept = []
+        self._restored = []
+        self._dirty = []
+        self._full = True
+        self._crowded = False
+
+    def invalidate(self):
+        """
+        Demande que la prochaine image soit redessinée entièrement (premier affichage, changement de monde).
+        """
+        self._full = True
+
+    def damage(self, rect):
+        """
+        Demande qu'une zone soit effacée à la prochaine image (texte durable qui change).
+
+        Paramètres :
+        - rect : Le pygame.Rect de la zone, ou None.
+        """
+        if rect:
+            self._damaged.append(rect)
+            if rect in self._kept:
+                self._kept.remove(rect)
+
+    def is_dirty(self, rect):
+        """
+        Vérifie si une zone a été effacée pendant l'image en cours (par begin).
+
+        Paramètres :
+        - rect : Le pygame.Rect de la zone, ou None (zone jamais dessinée).
+
+        Retourne :
+        Un booléen indiquant si ce qui était dessiné dans la zone doit être redessiné.
+        """
+        return self._full or rect is None or rect.collidelist(self._restored) != -1
+
+    def _restore(self, rect):
+        """
+        Redessine le décor et la sortie dans une zone de l'écran.
+        """
+        world = self.world
+        # Surface.fill garde la taille d'une zone qui dépasse en haut ou à gauche : elle
+        # effacerait des pixels que le blit ne redessine pas
+        rect = rect.clip(self.screen.get_rect())
+        if not rect:
+            return
+        source = rect.move(self.camera.x, self.camera.y)
+        if not world.fond.get_rect().contains(source):
+            self.screen.fill(BLACK, rect)
+        self.screen.blit(world.fond, rect, source)
+        exit_rect = self.camera.to_screen(world.sortie.get_rect(topleft=world.exit_pos))
+        part = exit_rect.clip(rect)
+        if part:
+            self.screen.blit(world.sortie, part, part.move(-exit_rect.x, -exit_rect.y))
+
+    def begin(self, alpha=None):
+        """
+        Efface les zones modifiées depuis l'image précédente et dessine les lemmings.
+
+        Paramètres :
+        - alpha : L'interpolation des positions des lemmings (voir lemming_positions).
+        """
+        world = self.world
+        camera = self.camera
+        view = camera.rect
+        if (camera.x, camera.y) != self._view:
+            self._view = (camera.x, camera.y)
+            self._full = True
+        L = world.lemmings
+        xs, ys = lemming_positions(world, alpha)
+        visible = visible_lemmings(world, xs, ys, view)
+        # Trop de lemmings à l'écran : l'image est de toute façon redessinée entièrement, cette
+        # fois et la suivante (pour effacer les lemmings), sans calculer leurs zones
+        if self._crowded:
+            self._full = True
+        self._crowded = visible.size > MAX_DIRTY_RECTS
+        if self._crowded:
+            self._previous = []
+            self._damaged = []
+            world.pop_carved()
+            self._redraw(world, visible, xs, ys, view)
+            return
+        sx, sy = (xs[visible] - view.x).tolist(), (ys[visible] - view.y).tolist()
+        ws, hs = L.w[visible].tolist(), L.h[visible].tolist()
+        dirty = self._previous + self._damaged
+        dirty.extend(camera.to_screen(rect) for rect in world.pop_carved() if rect.colliderect(view))
+        self._damaged = []
+        dirty.extend(pygame.Rect(x, y, w, h) for x, y, w, h in zip(sx, sy, ws, hs))
+        self._previous = dirty[len(dirty) - len(sx):]
+
+        # Une zone durable touchée est effacée en entier, pour être redessinée en entier
+        dirty.extend(rect for rect in self._kept if rect.collidelist(dirty) != -1)
+
+        if self._full or len(dirty) > MAX_DIRTY_RECTS:
+            self._redraw(world, visible, xs, ys, view)
+            return
+        for rect in dirty:
+            self._restore(rect)
+        _blit_lemmings(self.screen, world, visible, xs, ys, view)
+        self._restored = dirty
+        self._dirty = list(dirty)
+
+    def _redraw(self, world, visible, xs, ys, view):
+        """
+        Redessine l'image entière.
+        """
+        self._full = True
+        self.screen.fill(BLACK)
+        _draw_background(self.screen, world, view)
+        _blit_lemmings(self.screen, world, visible, xs, ys, view)
+        self._dirty = []
+
+    def mark(self, rect, keep=False):
+        """
+        Signale une zone dessinée par-dessus le monde (interface, surbrillance).
+
+        Paramètres :
+        - rect : Le pygame.Rect de la zone dessinée, ou None.
+        - keep : Si vrai, la zone n'est pas effacée à l'image suivante.
+        """
+        if rect:
+            if not keep:
+                self._previous.append(rect)
+            elif rect not in self._kept:
+                self._kept.append(rect)
+            self._dirty.append(rect)
+
+    def present(self):
+        """
+        Envoie à l'écran les zones modifiées, ou l'image entière si elle a été redessinée.
+        """
+        if self._full:
+            pygame.display.flip()
+            self._full = False
+        elif self._dirty:
+            pygame.display.update(self._dirty)
+        self._dirty = []
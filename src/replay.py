@@ -0,0 +1,222 @@
+"""
+Ce module enregistre les parties et les rejoue sans affichage.
+
+Une partie ne dépend que de la graine de son générateur aléatoire, du niveau (ou des
+paramètres donnés à World) et des actions données par le joueur. L'enregistrement ne contient donc que cela : chaque
+action est notée (pas de simulation, numéro du lemming, nouvel état). Le rejeu applique les
+actions au même pas, sans fenêtre ni attente, et vérifie que l'état final est identique à
+celui de la partie enregistrée : une partie enregistrée sert ainsi de charge de travail
+reproductible pour mesurer les performances.
+
+Utilisation en ligne de commande :
+
+    python -m src.replay partie.json --runs 5
+
+Classes :
+- Recording : Le contenu d'une partie enregistrée.
+- Recorder : Enregistre les actions du joueur pendant une partie.
+
+Fonctions :
+- state_digest(world) : Calcule une empreinte de l'état de la simulation.
+- replay(recording, check) : Rejoue une partie enregistrée sans affichage.
+
+Constantes :
+- FORMAT_VERSION : Le numéro du format des fichiers d'enregistrement.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time as _time
+import pygame
+
+from src.constants import imgs
+from src.engine import _charger_ressources
+from src.lemmings import COLUMNS
+from src.level import load_level
+from src.world import World
+
+FORMAT_VERSION = 1
+
+
+def state_digest(world):
+    """
+    Calcule une empreinte de l'état de la simulation : compteurs, lemmings et terrain.
+
+    Paramètres :
+    - world : Le monde du jeu.
+
+    Retourne :
+    Une chaîne hexadécimale (SHA-256).
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps([
+        world.tick, world.time, world.compteur_creation, world.nb_lemmings_arrived,
+        world.nb_lemmings_dead, world.currentActiveSpeeders,
+    ]).encode())
+    L = world.lemmings
+    for name, _ in COLUMNS:
+        digest.update(getattr(L, name).tobytes())
+    digest.update(world.terrain.solid.tobytes())
+    return digest.hexdigest()
+
+
+class Recording:
+    """
+    Le contenu d'une partie enregistrée.
+
+    Attributs :
+    - seed : La graine du générateur aléatoire de la partie.
+    - params : Les paramètres transmis à World (nb_lemmings, time_limit, ...).
+    - actions : La liste des actions du joueur, sous forme de tuples (pas, numéro du lemming, état).
+    - ticks : Le nombre de pas simulés pendant la partie.
+    - digest : L'empreinte de l'état final (voir state_digest).
+    - level : Le nom du niveau joué (voir src/level.py), ou None pour la carte map.png avec params.
+    """
+
+    def __init__(self, seed, params=None, actions=None, ticks=0, digest=None, level=None):
+        self.seed = seed
+        self.level = level
+        self.params = dict(params or {})
+        self.actions = list(actions or [])
+        self.ticks = ticks
+        self.digest = digest
+
+    def save(self, path):
+        """
+        Enregistre la partie dans un fichier JSON.
+
+        Paramètres :
+        - path : Le chemin du fichier.
+        """
+        with open(path, "w") as f:
+            json.dump({
+                "version": FORMAT_VERSION,
+                "seed": self.seed,
+                "level": self.level,
+                "params": self.params,
+                "actions": self.actions,
+                "ticks": self.ticks,
+                "digest": self.digest,
+            }, f)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Charge une partie enregistrée par save.
+
+        Paramètres :
+        - path : Le chemin du fichier.
+
+        Retourne :
+        Un nouvel objet Recording.
+        """
+        with open(path) as f:
+            data = json.load(f)
+        if data.get("version") != FORMAT_VERSION:
+            raise ValueError("Format d'enregistrement non supporté : {}".format(data.get("version")))
+        # JSON ne connaît pas les tuples : les positions redeviennent des tuples pour World
+        params = {k: tuple(v) if isinstance(v, list) else v for k, v in data["params"].items()}
+        actions = [tuple(action) for action in data["actions"]]
+        return cls(data["seed"], params, actions, data["ticks"], data["digest"], data.get("level"))
+
+
+class Recorder:
+    """
+    Enregistre les actions du joueur pendant une partie.
+
+    Les actions doivent passer par Recorder.assign au lieu de World.assign.
+
+    Paramètres :
+    - world : Le monde du jeu, dont la graine est enregistrée.
+    - params : Les paramètres donnés au constructeur de World.
+    - level : Le nom du niveau joué, si le monde a été créé à partir d'un niveau (voir src/level.py).
+    """
+
+    def __init__(self, world, params=None, level=None):
+        self.world = world
+        self.recording = Recording(world.seed, params, level=level)
+
+    def assign(self, lemming, etat):
+        """
+        Donne un nouvel état à un lemming et enregistre l'action si elle est appliquée.
+
+        Paramètres :
+        - lemming : L'indice du lemming.
+        - etat : Le nouvel état du lemming.
+
+        Retourne :
+        Un booléen indiquant si l'état a été appliqué (voir World.assign).
+        """
+        applied = self.world.assign(lemming, etat)
+        if applied:
+            self.recording.actions.append((self.world.tick, int(self.world.lemmings.id[lemming]), int(etat)))
+        return applied
+
+    def finish(self):
+        """
+        Note le nombre de pas simulés et l'empreinte de l'état final.
+
+        Retourne :
+        L'enregistrement de la partie (voir Recording).
+        """
+        self.recording.ticks = self.world.tick
+        self.recording.digest = state_digest(self.world)
+        return self.recording
+
+
+def replay(recording, check=True):
+    """
+    Rejoue une partie enregistrée sans affichage, aussi vite que possible.
+
+    Paramètres :
+    - recording : La partie enregistrée (voir Recording).
+    - check : Si vrai, vérifie que l'état final est identique à celui de la partie enregistrée.
+
+    Retourne :
+    Un dictionnaire contenant le nombre de pas simulés, l'empreinte de l'état final, le
+    résultat de la partie et le temps réel de calcul (en secondes).
+    """
+    fond, sortie, animations = _charger_ressources()
+    if recording.level is not None:
+        level = load_level(recording.level)
+        if level.exit_image != "sortie.png":
+            sortie = pygame.image.load(os.path.join(imgs, level.exit_image))
+        world = level.world(sortie, animations, seed=recording.seed)
+    else:
+        world = World(fond.copy(), sortie, animations, seed=recording.seed, **recording.params)
+    actions = sorted(recording.actions, key=lambda action: action[0])
+
+    start = _time.perf_counter()
+    next_action = 0
+    while True:
+        # Les actions notées au pas N ont été données après N pas, avant le suivant
+        while next_action < len(actions) and actions[next_action][0] <= world.tick:
+            _, id, etat = actions[next_action]
+            lemming = world.index_of(id)
+            if lemming is None:
+                raise AssertionError("Le lemming {} n'est plus en jeu au pas {}".format(id, world.tick))
+            world.assign(lemming, etat)
+            next_action += 1
+        if world.tick >= recording.ticks:
+            break
+        world.step()
+        world.pop_events()
+    wall_time = _time.perf_counter() - start
+
+    digest = state_digest(world)
+    if check and recording.digest is not None and digest != recording.digest:
+        raise AssertionError("Le rejeu ne reproduit pas la partie enregistrée (tick {})".format(world.tick))
+    return {"ticks": world.tick, "digest": digest, "result": world.result(), "wall_time": wall_time}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rejeu sans affichage d'une partie de Lemmings enregistrée.")
+    parser.add_argument("path", help="fichier d'enregistrement (voir python main.py --record)")
+    parser.add_argument("--runs", type=int, default=1, help="nombre de rejeux")
+    args = parser.parse_args()
+
+    recording = Recording.load(args.path)
+    for _ in range(args.runs):
+        print(json.dumps(replay(recording)))
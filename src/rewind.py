@@ -0,0 +1,150 @@
+"""
+Ce module garde en mémoire les dernières secondes d'une partie, pour pouvoir revenir en arrière.
+
+L'historique est un tampon circulaire d'une image par pas de simulation : au-delà de sa
+capacité, l'image la plus ancienne est oubliée, et la mémoire utilisée ne grandit plus, quelle
+que soit la durée de la partie. Chaque image contient :
+- les lemmings, sous forme d'enregistrements compacts (voir Lemmings.records) ;
+- les compteurs de la partie et l'état du générateur aléatoire (partagé avec l'image
+  précédente s'il n'a pas changé) ;
+- les pixels du décor effacés pendant le pas (voir carve dans src/stamps.py), avec leur
+  couleur d'avant : jamais une copie de toute la carte.
+
+Revenir d'un pas en arrière remet les pixels effacés pendant le dernier pas, puis recharge les
+lemmings de l'image précédente : le coût ne dépend que de ce pas, ce qui permet de remonter
+le temps image par image pendant la partie.
+
+Classes :
+- Rewind : L'historique des derniers pas d'une partie.
+
+Constantes :
+- REWIND_SECONDS : La durée de jeu gardée par défaut, en secondes.
+"""
+
+from collections import deque
+import numpy as np
+import pygame
+
+from src.world import TICKS_PER_SECOND
+
+REWIND_SECONDS = 10
+
+# Compteurs de World modifiés par la simulation
+_COUNTERS = ("tick", "time", "compteur_creation", "nb_lemmings_arrived", "nb_lemmings_dead", "currentActiveSpeeders")
+
+
+def _pixels(fond):
+    """
+    Retourne la vue NumPy des pixels du décor utilisée par carve : [x, y, composante] pour les
+    surfaces 24 bits, [x, y] sinon.
+    """
+    if fond.get_bytesize() == 3:
+        return pygame.surfarray.pixels3d(fond)
+    return pygame.surfarray.pixels2d(fond)
+
+
+class Rewind:
+    """
+    L'historique des derniers pas d'une partie.
+
+    L'historique s'attache au monde (World.rewind) : chaque pas de simulation y ajoute une
+    image, et les pixels effacés par carve y sont notés au passage.
+
+    Paramètres :
+    - world : Le monde du jeu.
+    - seconds : La durée de jeu gardée, en secondes.
+
+    Attributs :
+    - snapshots : Les images gardées, de la plus ancienne à la plus récente, sous forme de
+      tuples (enregistrements des lemmings, compteurs, état du générateur, pixels effacés).
+    """
+
+    def __init__(self, world, seconds=REWIND_SECONDS):
+        self.world = world
+        self.snapshots = deque(maxlen=seconds * TICKS_PER_SECOND + 1)
+        self._carves = []
+        self._random = None
+        world.rewind = self
+        self.record()
+
+    def __len__(self):
+        """
+        Retourne le nombre de pas que l'on peut encore défaire.
+        """
+        return len(self.snapshots) - 1
+
+    def reset(self):
+        """
+        Oublie tout l'historique, et repart de l'état actuel du monde (par exemple après le
+        chargement d'une sauvegarde).
+        """
+        self.snapshots.clear()
+        self._carves = []
+        self.record()
+
+    def note_carve(self, px, py, pixels):
+        """
+        Note des pixels sur le point d'être effacés, avec leur couleur (appelé par carve).
+
+        Paramètres :
+        - px, py : Des tableaux NumPy de coordonnées, déjà limitées à la carte.
+        - pixels : La vue NumPy des pixels du décor utilisée par carve.
+        """
+        terrain = self.world.terrain
+        # Les pixels vides du décor sont déjà noirs : seuls les pixels pleins changent
+        solid = terrain.solid[py, px]
+        if solid.any():
+            px, py = px[solid], py[solid]
+            self._carves.append(((py * terrain.width + px).astype(np.int32), pixels[px, py]))
+
+    def record(self):
+        """
+        Ajoute l'état actuel du monde à l'historique (appelé à la fin de chaque pas par World.step).
+        """
+        world = self.world
+        state = world.random.getstate()
+        if state == self._random:
+            state = self._random
+        self._random = state
+        counters = tuple(getattr(world, name) for name in _COUNTERS)
+        self.snapshots.append((world.lemmings.records(), counters, state, self._carves))
+        self._carves = []
+
+    def step_back(self):
+        """
+        Revient d'un pas en arrière, si l'historique le permet.
+
+        Retourne :
+        Un booléen indiquant si le monde a été remis dans l'état du pas précédent.
+        """
+        if len(self.snapshots) < 2:
+            return False
+        self._undo(self._carves)
+        self._carves = []
+        self._undo(self.snapshots.pop()[3])
+        records, counters, state, _ = self.snapshots[-1]
+        world = self.world
+        world.restore_lemmings(records)
+        for name, value in zip(_COUNTERS, counters):
+            setattr(world, name, value)
+        world.random.setstate(state)
+        self._random = state
+        return True
+
+    def _undo(self, carves):
+        """
+        Remet des pixels effacés, du plus récent au plus ancien, dans le terrain et dans le décor.
+        """
+        if not carves:
+            return
+        world = self.world
+        terrain = world.terrain
+        pixels = _pixels(world.fond)
+        for flat, colors in reversed(carves):
+            ys, xs = np.divmod(flat, terrain.width)
+            pixels[xs, ys] = colors
+            terrain.fill_pixels(ys, xs)
+            x0, y0 = int(xs.min()), int(ys.min())
+            world.add_carved(pygame.Rect(x0, y0, int(xs.max()) + 1 - x0, int(ys.max()) + 1 - y0))
+        # Libère la vue pour déverrouiller la surface
+        del pixels
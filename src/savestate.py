@@ -0,0 +1,192 @@
+"""
+Ce module sauvegarde l'état d'une partie en cours dans un fichier binaire compact, et le recharge.
+
+Une sauvegarde ne contient que ce qui a changé depuis le début du niveau :
+- le décor, sous forme de différence avec le décor d'origine (les pixels effacés, 8 par
+  octet, compressés par zlib) : une carte très creusée ne pèse que quelques kilo-octets ;
+- les lemmings, sous forme d'enregistrements compacts (voir RECORD dans src/lemmings.py) ;
+- l'état du générateur aléatoire et les compteurs de la partie ;
+- les actions du joueur depuis le début, pour que la partie reste rejouable (voir src/replay.py).
+
+Le chargement lit chaque section d'un bloc, sans parcourir aucun pixel : les pixels effacés
+sont retirés du terrain et du décor en une seule opération NumPy.
+
+Structure d'un fichier :
+- SAVE_MAGIC, puis deux entiers de 32 bits (version, longueur de l'en-tête) ;
+- un en-tête JSON (compteurs de la partie et position de chaque section) ;
+- les sections "carved" (pixels effacés), "lemmings" (enregistrements) et "random" (état
+  du générateur, entiers de 32 bits).
+
+Classes :
+- SaveState : Le contenu d'une sauvegarde.
+
+Fonctions :
+- save_state(world, path, level, actions) : Sauvegarde l'état d'une partie.
+- load_state(path) : Lit une sauvegarde.
+
+Constantes :
+- SAVE_MAGIC : Les premiers octets d'un fichier de sauvegarde.
+- SAVE_VERSION : Le numéro du format des sauvegardes.
+- QUICKSAVE : Le chemin de la sauvegarde rapide du jeu (touches F5 et F9).
+"""
+
+import json
+import os
+import struct
+import zlib
+import numpy as np
+import pygame
+
+from src.constants import saves
+from src.engine import _charger_ressources
+from src.lemmings import RECORD
+from src.terrain import Terrain
+
+SAVE_MAGIC = b"LEMSAVE\0"
+SAVE_VERSION = 1
+QUICKSAVE = os.path.join(saves, "quicksave.sav")
+
+_HEADER = struct.Struct("<8sII")
+
+# Compteurs de World recopiés tels quels
+_COUNTERS = (
+    "seed", "tick", "time", "compteur_creation", "nb_lemmings", "nb_lemmings_arrived",
+    "nb_lemmings_dead", "currentActiveSpeeders", "time_limit",
+)
+
+
+def _pristine(level):
+    """
+    Retourne la grille des pixels pleins du décor d'origine : celle du niveau, ou celle de map.png.
+    """
+    if level is not None:
+        return level.solid
+    return Terrain.from_surface(_charger_ressources()[0]).solid
+
+
+def save_state(world, path, level=None, actions=()):
+    """
+    Sauvegarde l'état d'une partie.
+
+    Paramètres :
+    - world : Le monde du jeu.
+    - path : Le chemin du fichier.
+    - level : Le niveau joué (voir src/level.py), dont le décor d'origine sert de référence,
+      ou None pour un monde créé à partir de map.png.
+    - actions : Les actions du joueur depuis le début de la partie (voir Recording.actions).
+    """
+    carved = _pristine(level) & ~world.terrain.solid
+    version, state, gauss = world.random.getstate()
+    sections = [
+        ("carved", zlib.compress(np.packbits(carved, axis=1).tobytes(), 1)),
+        ("lemmings", world.lemmings.records().tobytes()),
+        ("random", np.array(state, "<u4").tobytes()),
+    ]
+    header = {name: getattr(world, name) for name in _COUNTERS}
+    header.update({
+        "level": level.name if level is not None else None,
+        "width": world.terrain.width,
+        "height": world.terrain.height,
+        "spawn": world.spawn,
+        "exit_pos": world.exit_pos,
+        "lemmings": len(world.lemmings),
+        "random": [version, gauss],
+        "actions": [list(action) for action in actions],
+    })
+    offset = 0
+    header["sections"] = {}
+    for name, data in sections:
+        header["sections"][name] = [offset, len(data)]
+        offset += len(data)
+    encoded = json.dumps(header).encode()
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(SAVE_MAGIC, SAVE_VERSION, len(encoded)))
+        f.write(encoded)
+        for _, data in sections:
+            f.write(data)
+
+
+def load_state(path):
+    """
+    Lit une sauvegarde écrite par save_state.
+
+    Paramètres :
+    - path : Le chemin du fichier.
+
+    Retourne :
+    Un nouvel objet SaveState.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, length = _HEADER.unpack_from(data)
+    if magic != SAVE_MAGIC:
+        raise ValueError("{} n'est pas un fichier de sauvegarde".format(path))
+    if version != SAVE_VERSION:
+        raise ValueError("Format de sauvegarde non supporté : {}".format(version))
+    start = _HEADER.size + length
+    header = json.loads(data[_HEADER.size:start])
+    view = memoryview(data)
+
+    def section(name):
+        offset, size = header["sections"][name]
+        return view[start + offset:start + offset + size]
+
+    return SaveState(header, bytes(section("carved")), np.frombuffer(section("lemmings"), RECORD), np.frombuffer(section("random"), "<u4"))
+
+
+class SaveState:
+    """
+    Le contenu d'une sauvegarde.
+
+    Paramètres :
+    - header : L'en-tête de la sauvegarde (compteurs de la partie, niveau, actions).
+    - carved : Les pixels effacés, compressés (voir save_state).
+    - records : Les lemmings, sous forme d'enregistrements (voir RECORD dans src/lemmings.py).
+    - random : L'état du générateur aléatoire.
+
+    Attributs :
+    - level : Le nom du niveau joué, ou None pour la carte map.png.
+    - actions : Les actions du joueur depuis le début de la partie, sous forme de tuples (pas, numéro du lemming, état).
+    """
+
+    def __init__(self, header, carved, records, random):
+        self.header = header
+        self.level = header["level"]
+        self.actions = [tuple(action) for action in header["actions"]]
+        self.carved = carved
+        self.records = records
+        self.random = random
+
+    def restore(self, world):
+        """
+        Remet un monde dans l'état sauvegardé.
+
+        Le monde doit venir d'être créé sur le même niveau (décor d'origine, avant tout pas de
+        simulation) : seuls les pixels effacés depuis le début sont retirés.
+
+        Paramètres :
+        - world : Le monde du jeu.
+        """
+        header = self.header
+        terrain = world.terrain
+        if (terrain.width, terrain.height) != (header["width"], header["height"]):
+            raise ValueError("La sauvegarde ne correspond pas à ce niveau")
+
+        packed = np.frombuffer(zlib.decompress(self.carved), np.uint8).reshape(terrain.height, -1)
+        carved = np.unpackbits(packed, axis=1, count=terrain.width).view(bool)
+        if carved.any():
+            terrain.clear_mask(carved)
+            # Les surfaces Pygame sont indexées [x, y] ; les pixels effacés sont noirs
+            pixels = pygame.surfarray.pixels3d(world.fond)
+            pixels[carved.T] = 0
+            del pixels
+            world.add_carved(world.fond.get_rect())
+
+        world.restore_lemmings(self.records)
+        for name in _COUNTERS:
+            setattr(world, name, header[name])
+        version, gauss = header["random"]
+        world.random.setstate((version, tuple(self.random.tolist()), gauss))
+        world.events = []
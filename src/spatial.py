@@ -0,0 +1,181 @@
+"""
+Ce module implémente un index spatial en grille uniforme (spatial hash).
+
+Les éléments indexés sont rangés dans la case de la grille qui contient leur coin haut
+gauche. La grille est entourée d'une bordure de cases toujours vides, pour que les voisines
+d'une case du bord existent sans test supplémentaire. Tant que les éléments et les zones recherchées sont plus petits qu'une case, deux
+rectangles qui se touchent sont toujours dans la même case ou dans des cases voisines : une
+recherche n'examine donc que 9 cases au lieu de tous les éléments.
+
+Le module fournit aussi RectUnion, pour des rectangles immobiles (lemmings arrêtés) : seule
+compte la présence d'un rectangle, pas lequel, et la réponse ne dépend pas du nombre de
+rectangles voisins.
+
+Classes :
+- SpatialHash : Grille uniforme d'identifiants, interrogeable pour de nombreux points à la fois.
+- RectUnion : Union de rectangles immobiles, interrogeable pour de nombreuses zones à la fois.
+"""
+
+import numpy as np
+
+from src.constants import LARG
+
+# Décalages des 9 cases voisines (case elle-même comprise)
+_DX = np.array([-1, 0, 1] * 3)
+_DY = np.repeat([-1, 0, 1], 3)
+
+
+class SpatialHash:
+    """
+    Grille uniforme d'identifiants (entiers) positionnés sur la carte.
+
+    La grille est compacte (identifiants triés par case) : pour des éléments qui bougent tous à
+    chaque pas, build la remplit entièrement en une seule opération.
+
+    Attributs :
+    - cell : La taille (en pixels) d'une case.
+    - cols, rows : Le nombre de colonnes et de lignes de la grille.
+    """
+
+    def __init__(self, width, height, cell=LARG):
+        self.cell = cell
+        self.cols = width // cell + 1
+        self.rows = height // cell + 1
+        self._ids = np.zeros(0, np.int64)
+        self._start = np.zeros((self.cols + 2) * (self.rows + 2) + 1, np.int64)
+        # Décalage de la clé de case pour chacune des 9 voisines, bordure comprise
+        self._neighbours = _DY * (self.cols + 2) + _DX
+
+    def _cell_keys(self, xs, ys):
+        """
+        Calcule la clé de la case de chaque position (les positions hors carte vont dans la case du bord).
+        """
+        cx = np.clip(np.asarray(xs) // self.cell, 0, self.cols - 1) + 1
+        cy = np.clip(np.asarray(ys) // self.cell, 0, self.rows - 1) + 1
+        return cy * (self.cols + 2) + cx
+
+    def build(self, ids, xs, ys):
+        """
+        Remplace le contenu de la grille par les éléments donnés, en une seule opération.
+
+        Paramètres :
+        - ids, xs, ys : Des tableaux NumPy de même longueur.
+        """
+        keys = self._cell_keys(xs, ys)
+        order = np.argsort(keys, kind="stable")
+        self._ids = np.asarray(ids)[order].astype(np.int64)
+        self._start = np.searchsorted(keys[order], np.arange(len(self._start)))
+
+    def query(self, xs, ys):
+        """
+        Cherche les éléments des cases voisines de chaque position.
+
+        Paramètres :
+        - xs, ys : Des tableaux NumPy de positions (coin haut gauche des zones recherchées).
+
+        Retourne :
+        Un tuple (q, ids) de tableaux NumPy de même longueur : pour chaque couple candidat,
+        q est le rang de la position dans xs/ys et ids l'identifiant de l'élément. Les couples
+        doivent encore être testés précisément par l'appelant.
+        """
+        if self._ids.size == 0 or len(xs) == 0:
+            return np.zeros(0, np.int64), np.zeros(0, np.int64)
+        # Les 9 cases voisines de chaque position ; seules les cases non vides sont gardées
+        keys = (self._cell_keys(xs, ys)[:, None] + self._neighbours).ravel()
+        start = self._start[keys]
+        count = self._start[keys + 1] - start
+        used = np.flatnonzero(count)
+        if used.size == 0:
+            return np.zeros(0, np.int64), np.zeros(0, np.int64)
+        q, start, count = used // 9, start[used], count[used]
+
+        # Développe chaque (position, case) en autant de couples que la case contient d'éléments
+        total = int(count.sum())
+        q = np.repeat(q, count)
+        offset = np.arange(total) - np.repeat(np.cumsum(count) - count, count)
+        return q, self._ids[np.repeat(start, count) + offset]
+
+
+class RectUnion:
+    """
+    Union de rectangles immobiles, interrogeable pour de nombreuses zones à la fois.
+
+    Les bords des rectangles découpent le plan en une grille irrégulière (une colonne par
+    abscisse de bord distincte, une ligne par ordonnée distincte), quelle que soit la taille de
+    la carte. Chaque case de cette grille est entièrement couverte ou entièrement libre ; une
+    table de sommes cumulées des cases couvertes indique en temps constant si une zone touche
+    l'union. Les rectangles sont demi-ouverts, comme pygame.Rect : deux rectangles qui se
+    touchent par un bord ne se chevauchent pas.
+
+    Paramètres :
+    - xs, ys, ws, hs : Des tableaux NumPy de même longueur (coin haut gauche et taille de chaque rectangle).
+    """
+
+    def __init__(self, xs, ys, ws, hs):
+        xs, ys = np.asarray(xs, np.int64), np.asarray(ys, np.int64)
+        self._boxes = (xs, ys, np.asarray(ws, np.int64), np.asarray(hs, np.int64))
+        x1, y1 = xs + ws, ys + hs
+        self._xe = np.unique(np.concatenate([xs, x1]))
+        self._ye = np.unique(np.concatenate([ys, y1]))
+        # La case k d'un axe s'étend du bord k - 1 au bord k (la case 0 et la dernière sont
+        # infinies) : un rectangle couvre les cases de rang(début) + 1 à rang(fin) compris
+        cx0, cx1 = np.searchsorted(self._xe, xs) + 1, np.searchsorted(self._xe, x1) + 1
+        cy0, cy1 = np.searchsorted(self._ye, ys) + 1, np.searchsorted(self._ye, y1) + 1
+        diff = np.zeros((self._ye.size + 2, self._xe.size + 2), np.int32)
+        np.add.at(diff, (cy0, cx0), 1)
+        np.add.at(diff, (cy0, cx1), -1)
+        np.add.at(diff, (cy1, cx0), -1)
+        np.add.at(diff, (cy1, cx1), 1)
+        covered = diff.cumsum(axis=0).cumsum(axis=1) > 0
+        self._sums = np.zeros((covered.shape[0] + 1, covered.shape[1] + 1), np.int32)
+        self._sums[1:, 1:] = covered.cumsum(axis=0, dtype=np.int32).cumsum(axis=1)
+        self._xrank = self._rank_table(self._xe)
+        self._yrank = self._rank_table(self._ye)
+
+    def __reduce__(self):
+        """
+        L'union est transmise à un autre processus par ses rectangles, bien plus petits que ses
+        tables (voir src/parallel.py).
+        """
+        return RectUnion, self._boxes
+
+    @staticmethod
+    def _rank_table(edges):
+        """
+        Précalcule le nombre de bords inférieurs ou égaux à chaque coordonnée, de edges[0] - 1 à
+        edges[-1] + 1 : les recherches se font par simple lecture au lieu d'une recherche dichotomique.
+        """
+        if edges.size == 0:
+            return 0, np.zeros(1, np.int64)
+        values = np.arange(edges[0] - 1, edges[-1] + 2)
+        return edges[0] - 1, np.searchsorted(edges, values, "right")
+
+    @staticmethod
+    def _rank(table, values):
+        """
+        Retourne le nombre de bords inférieurs ou égaux à chaque valeur (voir _rank_table).
+        """
+        start, ranks = table
+        return ranks[np.clip(values - start, 0, ranks.size - 1)]
+
+    def overlaps(self, xs, ys, ws, hs):
+        """
+        Vérifie si des zones touchent l'union des rectangles.
+
+        Paramètres :
+        - xs, ys, ws, hs : Des tableaux NumPy de même longueur (coin haut gauche et taille
+          non nulle de chaque zone).
+
+        Retourne :
+        Un tableau de booléens indiquant pour chaque zone si elle chevauche au moins un rectangle.
+        """
+        if self._xe.size == 0:
+            return np.zeros(len(xs), bool)
+        xs, ys = np.asarray(xs), np.asarray(ys)
+        # Cases contenant le premier et le dernier pixel de chaque zone
+        cx0 = self._rank(self._xrank, xs)
+        cx1 = self._rank(self._xrank, xs + ws - 1) + 1
+        cy0 = self._rank(self._yrank, ys)
+        cy1 = self._rank(self._yrank, ys + hs - 1) + 1
+        sums = self._sums
+        return sums[cy1, cx1] - sums[cy0, cx1] - sums[cy1, cx0] + sums[cy0, cx0] > 0
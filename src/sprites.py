@@ -0,0 +1,216 @@
+"""
+Ce module charge et découpe les sprites des lemmings à partir de la planche de sprites.
+
+Il n'utilise pas l'écran : les animations peuvent être chargées sans fenêtre (simulation).
+
+Les rectangles de découpe des sprites sont calculés avec NumPy, une série (ligne de la
+planche) à la fois, puis enregistrés dans le répertoire cache sous l'empreinte des pixels de
+la planche : les démarrages suivants les relisent sans examiner aucun pixel. Une planche
+modifiée a une autre empreinte, ses rectangles sont donc recalculés.
+
+Fonctions :
+- ChargeSerieSprites(planche, id, boxes) : Charge et découpe des sprites à partir d'une feuille de sprites en fonction de l'ID donné.
+- sprite_boxes(planche, id) : Calcule les rectangles de découpe des sprites d'une série.
+- crop_surface(surf) : Découpe une surface pour supprimer les bordures noires environnantes.
+- remove_columns(sprite_list) : Supprime les colonnes noires d'une liste de sprites.
+- charger_animations(planche) : Charge toutes les animations des lemmings et leurs versions retournées.
+
+Constantes :
+- SERIES : Un dictionnaire associant le nom de chaque animation à sa ligne dans la planche.
+- CACHE_VERSION : Le numéro du format du cache, à changer si le calcul des rectangles change.
+"""
+
+import hashlib
+import json
+import os
+import numpy as np
+import pygame
+
+from src.constants import BLACK, RED, LARG, cache, imgs
+from src.terrain import surface_non_black
+
+SERIES = {
+    "marche": 0,
+    "tombe": 1,
+    "dead": 10,
+    "stop": 4,
+    "miner": 9,
+    "floater": 3,
+    "bomber": 5,
+}
+
+CACHE_VERSION = 1
+
+
+def ChargeSerieSprites(planche, id, boxes=None):
+    """
+    Charge et découpe des sprites en fonction de l'ID donné.
+
+    Paramètres :
+    - planche : La surface Pygame de la planche de sprites.
+    - id : Un entier représentant l'ID de la série de sprites à charger.
+    - boxes : Les rectangles de découpe de la série (voir sprite_boxes), s'ils sont déjà connus.
+
+    Retourne :
+    Une liste de surfaces représentant les sprites de la série chargée.
+    """
+    if boxes is None:
+        boxes = sprite_boxes(planche, id)
+    return [planche.subsurface(box) for box in boxes]
+
+
+def sprite_boxes(planche, id):
+    """
+    Calcule les rectangles de découpe des sprites d'une série.
+
+    Les cases marquées en rouge sont ignorées ; les autres sont découpées comme par
+    crop_surface, mais toutes les cases de la série sont examinées en une seule opération.
+
+    Paramètres :
+    - planche : La surface Pygame de la planche de sprites.
+    - id : Un entier représentant l'ID de la série de sprites.
+
+    Retourne :
+    Une liste de tuples (x, y, largeur, hauteur) dans la planche, un par sprite.
+    """
+    band = planche.subsurface((0, LARG * id, LARG * 18, LARG))
+    # Colonnes contenant au moins un pixel non noir, pour chaque case : [case, colonne]
+    used_columns = surface_non_black(band).reshape(LARG, 18, LARG).any(axis=0)
+    boxes = []
+    for i in range(18):
+        if band.get_at((LARG * i + 10, 10)) == RED:
+            continue
+        used = np.flatnonzero(used_columns[i])
+        if used.size and used[0] < used[-1]:
+            boxes.append((LARG * i + int(used[0]), LARG * id, int(used[-1] - used[0]) + 1, LARG))
+        else:
+            boxes.append((LARG * i, LARG * id, LARG, LARG))  # Pas de bordures noires détectées
+    return boxes
+
+
+def crop_surface(surf):
+    """
+    Découpe une surface pour supprimer les bordures noires environnantes.
+
+    Paramètres :
+    - surf : Une surface Pygame à découper.
+
+    Retourne :
+    Une nouvelle surface Pygame sans les bordures noires.
+    """
+    # Colonnes contenant au moins un pixel non noir
+    used = np.flatnonzero(surface_non_black(surf).any(axis=0))
+
+    # Découper l'image en fonction des bords trouvés
+    if used.size and used[0] < used[-1]:
+        cropped_surf = surf.subsurface((int(used[0]), 0, int(used[-1] - used[0]) + 1, surf.get_height()))
+    else:
+        cropped_surf = surf.copy()  # Pas de bordures noires détectées, renvoyer une copie non modifiée
+
+    return cropped_surf
+
+
+def remove_columns(sprite_list):
+    """
+    Supprime les colonnes noires d'une liste de sprites.
+
+    Paramètres :
+    - sprite_list : Une liste de surfaces Pygame représentant les sprites.
+
+    Retourne :
+    Une liste de surfaces Pygame sans les colonnes noires.
+    """
+    if not sprite_list:
+        return sprite_list
+
+    # Get the width of the first sprite
+    sprite_width = sprite_list[0].get_width()
+
+    # Iterate through each column
+    for col in range(sprite_width):
+        column_empty = True
+        # Check if the entire column is black in each sprite
+        for sprite in sprite_list:
+            if sprite.get_at((col, 0)) != BLACK:
+                column_empty = False
+                break
+        # If the column is entirely black, remove it from all sprites
+        if column_empty:
+            for sprite in sprite_list:
+                sprite_list[sprite_list.index(sprite)] = sprite.subsurface(
+                    (0, 0, col, sprite.get_height())
+                )
+    return sprite_list
+
+
+def charger_animations(planche=None):
+    """
+    Charge toutes les animations des lemmings et leurs versions retournées.
+
+    Paramètres :
+    - planche : La surface Pygame de la planche de sprites. Si elle est absente, planche.png est chargée.
+
+    Retourne :
+    Un dictionnaire associant à chaque nom de SERIES la liste de ses sprites, et à chaque
+    nom suffixé par "_flipped" la liste des mêmes sprites retournés horizontalement.
+    """
+    if planche is None:
+        planche = pygame.image.load(os.path.join(imgs, "planche.png"))
+        planche.set_colorkey((0, 0, 0))
+
+    path = _cache_path(planche)
+    boxes = _load_boxes(path)
+    if boxes is None:
+        boxes = {name: sprite_boxes(planche, id) for name, id in SERIES.items()}
+        _save_boxes(path, boxes)
+
+    animations = {}
+    for name, id in SERIES.items():
+        serie = ChargeSerieSprites(planche, id, boxes[name])
+        animations[name] = serie
+        animations[name + "_flipped"] = [pygame.transform.flip(spr, True, False) for spr in serie]
+    return animations
+
+
+def _cache_path(planche):
+    """
+    Calcule le chemin du fichier de cache d'une planche, à partir de l'empreinte de ses pixels,
+    de la taille des cases, des séries et de la version du format.
+    """
+    digest = hashlib.sha256(pygame.image.tobytes(planche, "RGBA"))
+    digest.update(json.dumps([CACHE_VERSION, LARG, SERIES], sort_keys=True).encode())
+    return os.path.join(cache, "sprites-{}.json".format(digest.hexdigest()))
+
+
+def _load_boxes(path):
+    """
+    Relit les rectangles de découpe enregistrés par _save_boxes.
+
+    Retourne :
+    Le dictionnaire des rectangles de chaque série, ou None si le fichier est absent ou illisible.
+    """
+    try:
+        with open(path) as f:
+            boxes = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(boxes, dict) or set(boxes) != set(SERIES):
+        return None
+    return {name: [tuple(box) for box in serie] for name, serie in boxes.items()}
+
+
+def _save_boxes(path, boxes):
+    """
+    Enregistre les rectangles de découpe. Un cache impossible à écrire (répertoire en lecture
+    seule) n'est pas une erreur : les rectangles seront simplement recalculés au prochain démarrage.
+    """
+    tmp = "{}.{}.tmp".format(path, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "w") as f:
+            json.dump(boxes, f)
+        # Remplacement atomique : une autre instance ne lit jamais un fichier à moitié écrit
+        os.replace(tmp, path)
+    except OSError:
+        if os.path.exists(tmp):
+            os.remove(tmp)
@@ -0,0 +1,140 @@
+"""
+Ce module efface des formes précalculées (tampons) dans le décor.
+
+Les formes creusées par les lemmings (disque de l'explosion, lignes des mineurs) sont
+calculées une seule fois sous forme de masques. Un appel à carve efface une forme à
+plusieurs positions d'un coup, à la fois dans la surface visible du décor et dans le terrain
+physique, en ignorant la partie qui dépasse de la carte. Les zones effacées sont notées dans
+le monde (voir World.add_carved) pour que l'affichage ne redessine qu'elles. Si le monde garde
+un historique (voir src/rewind.py), les pixels sont notés avant d'être effacés.
+
+Classes :
+- Stamp : Une forme à effacer, précalculée une fois.
+
+Fonctions :
+- carve(world, stamp, xs, ys) : Efface une forme du décor à une ou plusieurs positions.
+
+Constantes :
+- EXPLOSION : Le disque de rayon 30 effacé par un Kamizake.
+- MAX_PIXELS_PER_PASS : Le nombre maximal de pixels traités en une seule opération NumPy.
+"""
+
+import functools
+import numpy as np
+import pygame
+
+from src.constants import BLACK
+
+MAX_PIXELS_PER_PASS = 1 << 20
+
+
+class Stamp:
+    """
+    Une forme à effacer, précalculée une fois.
+
+    Attributs :
+    - mask : Tableau de booléens indexé [y, x], vrai pour les pixels à effacer.
+    - ox, oy : Le décalage entre la position donnée à carve et le coin haut gauche du masque.
+    - dys, dxs : Les coordonnées (relatives au coin haut gauche) des pixels à effacer.
+    """
+
+    def __init__(self, mask, ox=0, oy=0):
+        self.mask = mask
+        self.ox, self.oy = ox, oy
+        self.dys, self.dxs = np.nonzero(mask)
+        # Nom et paramètres de la méthode qui a créé la forme, s'il y en a une
+        self._recipe = None
+
+    def __reduce__(self):
+        """
+        Une forme précalculée est transmise à un autre processus par la méthode qui l'a créée,
+        et non par ses pixels (voir src/parallel.py).
+        """
+        if self._recipe is None:
+            return Stamp, (self.mask, self.ox, self.oy)
+        return _stamp, self._recipe
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def disk(cls, radius):
+        """
+        Crée (une seule fois par rayon) un disque centré sur la position donnée à carve.
+
+        Paramètres :
+        - radius : Le rayon du disque.
+        """
+        yy, xx = np.ogrid[-radius:radius + 1, -radius:radius + 1]
+        # Vérifie si le point (i, j) est dans le rayon autour du centre (0, 0)
+        stamp = cls(xx ** 2 + yy ** 2 <= radius ** 2, -radius, -radius)
+        stamp._recipe = ("disk", radius)
+        return stamp
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def rect(cls, width, height):
+        """
+        Crée (une seule fois par taille) un rectangle dont le coin haut gauche est la position donnée à carve.
+
+        Paramètres :
+        - width, height : Les dimensions du rectangle.
+        """
+        stamp = cls(np.ones((height, width), bool))
+        stamp._recipe = ("rect", width, height)
+        return stamp
+
+
+def _stamp(kind, *args):
+    """
+    Retrouve une forme précalculée à partir de la méthode qui l'a créée (voir Stamp.__reduce__).
+    """
+    return getattr(Stamp, kind)(*args)
+
+
+EXPLOSION = Stamp.disk(30)
+
+
+def carve(world, stamp, xs, ys):
+    """
+    Efface une forme du décor à une ou plusieurs positions.
+
+    Paramètres :
+    - world : Le monde du jeu.
+    - stamp : La forme à effacer.
+    - xs, ys : Les positions (entiers ou tableaux NumPy de même longueur).
+    """
+    xs = np.atleast_1d(xs).astype(np.int64) + stamp.ox
+    ys = np.atleast_1d(ys).astype(np.int64) + stamp.oy
+    if xs.size == 0:
+        return
+    terrain = world.terrain
+    per_pass = max(1, MAX_PIXELS_PER_PASS // max(1, stamp.dxs.size))
+
+    fond = world.fond
+    if fond.get_bytesize() == 3:
+        # Les surfaces 24 bits n'ont pas de vue 2D : on efface les trois composantes
+        pixels, black = pygame.surfarray.pixels3d(fond), 0
+    else:
+        # Un seul entier par pixel : la couleur noire opaque dans le format de la surface
+        pixels = pygame.surfarray.pixels2d(fond)
+        black = np.array(fond.map_rgb(BLACK)).astype(pixels.dtype)
+    for k in range(0, xs.size, per_pass):
+        px = (xs[k:k + per_pass, None] + stamp.dxs).ravel()
+        py = (ys[k:k + per_pass, None] + stamp.dys).ravel()
+        inside = (px >= 0) & (px < terrain.width) & (py >= 0) & (py < terrain.height)
+        px, py = px[inside], py[inside]
+        if world.rewind is not None:
+            # Les pixels sont notés avant d'être effacés, pour pouvoir revenir en arrière
+            world.rewind.note_carve(px, py, pixels)
+        terrain.clear_pixels(py, px)
+        # Les surfaces Pygame sont indexées [x, y]
+        pixels[px, py] = black
+    # Libère la vue pour déverrouiller la surface
+    del pixels
+
+    # Zones à redessiner par l'affichage
+    height, width = stamp.mask.shape
+    bounds = fond.get_rect()
+    for x, y in zip(xs.tolist(), ys.tolist()):
+        rect = pygame.Rect(x, y, width, height).clip(bounds)
+        if rect:
+            world.add_carved(rect)
@@ -0,0 +1,403 @@
+"""
+Ce module implémente la représentation physique du terrain.
+
+Les fonctions de collision du jeu n'interrogent plus les surfaces Pygame pixel par pixel
+(get_at) : elles travaillent sur une grille d'occupation NumPy construite une seule fois
+au chargement de la carte. Des sommes cumulées par ligne et par colonne permettent de
+répondre en une seule opération pour tous les lemmings à la fois.
+
+Les sommes cumulées sont découpées en tronçons de CHUNK_SIZE pixels : chacune repart de zéro
+au début de son tronçon. Une modification du décor ne recalcule que les tronçons qu'elle
+touche, quelle que soit la taille de la carte, et les sommes tiennent sur 16 bits.
+
+Pour chaque pixel, la ligne du premier sol en dessous (dans la même colonne) est aussi tenue
+à jour, seulement dans les colonnes modifiées : la chute d'un lemming peut ainsi être prévue
+jusqu'à son point d'arrivée, sans tester le sol à chaque pixel (voir ground_below_many).
+
+Pour les tests au pixel près entre une image de lemming et le décor, la grille est aussi
+disponible sous forme de pygame.mask.Mask (voir Terrain.mask et Terrain.overlaps). Il n'est
+construit qu'à la première demande, puis seules les zones modifiées sont recopiées.
+
+Les grilles peuvent être placées en mémoire partagée (voir Terrain.share) : d'autres processus
+les lisent alors sans copie, et voient les modifications faites par le processus principal
+(voir src/parallel.py).
+
+Classes :
+- Terrain : Grille d'occupation du décor interrogée par les fonctions de collision.
+
+Fonctions :
+- surface_non_black(surf) : Calcule le masque des pixels non noirs d'une surface.
+- mask_from_array(grid) : Convertit une grille de booléens en pygame.mask.Mask.
+
+Constantes :
+- CHUNK_SIZE : La longueur (en pixels) des tronçons des sommes cumulées.
+- MAX_STALE_RECTS : Le nombre maximal de zones du masque à recopier gardées avant fusion.
+"""
+
+from multiprocessing import shared_memory
+import numpy as np
+import pygame
+
+CHUNK_SIZE = 256
+MAX_STALE_RECTS = 64
+
+# Les grilles placées en mémoire partagée par Terrain.share
+_SHARED = ("solid", "decor", "_ground_cs", "_wall_cs", "_below")
+
+
+def surface_non_black(surf):
+    """
+    Calcule le masque des pixels non noirs d'une surface.
+
+    Un pixel est considéré comme noir s'il vaut exactement (0, 0, 0, 255), comme pour les
+    comparaisons `get_at(...) != BLACK` du jeu.
+
+    Paramètres :
+    - surf : Une surface Pygame.
+
+    Retourne :
+    Un tableau NumPy de booléens indexé [y, x].
+    """
+    rgb = pygame.surfarray.array3d(surf)
+    mask = rgb.any(axis=2)
+    if surf.get_flags() & pygame.SRCALPHA:
+        mask |= pygame.surfarray.array_alpha(surf) != 255
+    return mask.T.copy()
+
+
+def mask_from_array(grid):
+    """
+    Convertit une grille de booléens en pygame.mask.Mask.
+
+    Paramètres :
+    - grid : Tableau de booléens indexé [y, x].
+
+    Retourne :
+    Un nouveau pygame.mask.Mask de la taille de la grille.
+    """
+    height, width = grid.shape
+    pixels = np.zeros((height, width, 4), np.uint8)
+    pixels[:, :, 3] = grid
+    pixels[:, :, 3] *= 255
+    return pygame.mask.from_surface(pygame.image.frombuffer(pixels.tobytes(), (width, height), "RGBA"))
+
+
+class Terrain:
+    """
+    Grille d'occupation du décor utilisée pour la physique.
+
+    Paramètres :
+    - solid : La grille des pixels pleins de la carte.
+    - decor : La grille des éléments fixes, si elle est déjà connue (voir src/level.py).
+
+    Attributs :
+    - solid : Tableau de booléens indexé [y, x], vrai là où le décor est plein. C'est la partie
+      destructible du terrain (creusage, explosions).
+    - decor : Tableau de booléens indexé [y, x] des éléments fixes dessinés par-dessus la carte
+      (la sortie). Ils servent de sol mais pas de mur, comme lorsque le sol était lu sur l'écran.
+    - width, height : Dimensions de la grille.
+
+    Les sommes cumulées `_ground_cs` (sol, par ligne, indexées [y, tronçon, k]) et `_wall_cs`
+    (murs, par colonne, indexées [tronçon, k, x]) comptent les pixels des k premières cases de
+    chaque tronçon. Elles ne sont recalculées que sur les tronçons touchés par une modification.
+    `_below[y, x]` est la première ligne de sol à partir de y dans la colonne x (height s'il n'y
+    en a pas) ; la ligne supplémentaire `_below[height]` vaut height.
+    """
+
+    def __init__(self, solid, decor=None):
+        self.solid = np.ascontiguousarray(solid)
+        self.height, self.width = solid.shape
+        self.decor = np.zeros_like(solid) if decor is None else np.ascontiguousarray(decor)
+        self._chunks_x = -(-self.width // CHUNK_SIZE)
+        self._chunks_y = -(-self.height // CHUNK_SIZE)
+        self._ground_cs = np.zeros((self.height, self._chunks_x, CHUNK_SIZE + 1), np.int16)
+        self._wall_cs = np.zeros((self._chunks_y, CHUNK_SIZE + 1, self.width), np.int16)
+        self._below = np.full((self.height + 1, self.width), self.height, np.int16)
+        self._mask = None
+        self._stale = []
+        self._blocks = []
+        self._refresh(0, 0, self.width, self.height)
+
+    def _refresh(self, x0, y0, x1, y1):
+        """
+        Recalcule les sommes cumulées des tronçons touchés par une modification de la zone donnée.
+
+        Paramètres :
+        - x0, y0 : Le coin haut gauche de la zone modifiée (inclus).
+        - x1, y1 : Le coin bas droit de la zone modifiée (exclu).
+        """
+        C = CHUNK_SIZE
+        # Sol : les tronçons des lignes y0 à y1 - 1 qui contiennent les colonnes x0 à x1 - 1
+        c0, c1 = x0 // C, (x1 - 1) // C + 1
+        ground = np.zeros((y1 - y0, (c1 - c0) * C), bool)
+        end = min(c1 * C, self.width)
+        np.bitwise_or(self.solid[y0:y1, c0 * C:end], self.decor[y0:y1, c0 * C:end], out=ground[:, :end - c0 * C])
+        np.cumsum(ground.reshape(y1 - y0, c1 - c0, C), axis=2, out=self._ground_cs[y0:y1, c0:c1, 1:])
+        # Murs : les tronçons des colonnes x0 à x1 - 1 qui contiennent les lignes y0 à y1 - 1
+        c0, c1 = y0 // C, (y1 - 1) // C + 1
+        wall = np.zeros(((c1 - c0) * C, x1 - x0), bool)
+        end = min(c1 * C, self.height)
+        wall[:end - c0 * C] = self.solid[c0 * C:end, x0:x1]
+        np.cumsum(wall.reshape(c1 - c0, C, x1 - x0), axis=1, out=self._wall_cs[c0:c1, 1:, x0:x1])
+        # Premier sol en dessous, dans les colonnes x0 à x1 - 1 : les lignes de la zone sont
+        # recalculées en remontant depuis la ligne y1, qui reste valable
+        ground = self.solid[y0:y1, x0:x1] | self.decor[y0:y1, x0:x1]
+        near = np.where(ground, np.arange(y0, y1, dtype=np.int16)[:, None], np.int16(self.height))
+        near = np.vstack((near, self._below[y1:y1 + 1, x0:x1]))
+        self._below[y0:y1, x0:x1] = np.minimum.accumulate(near[::-1], axis=0)[:0:-1]
+        # Au-dessus de la zone, seules changent les lignes dont le premier sol était dans la
+        # zone ou plus bas : il n'y a aucun sol entre elles et la ligne y0
+        above = self._below[:y0, x0:x1]
+        np.copyto(above, self._below[y0, x0:x1], where=above >= y0)
+        # Le masque, s'il a déjà été construit, sera mis à jour à la prochaine demande
+        if self._mask is not None:
+            self._stale.append(pygame.Rect(x0, y0, x1 - x0, y1 - y0))
+            if len(self._stale) > MAX_STALE_RECTS:
+                self._stale = [self._stale[0].unionall(self._stale[1:])]
+
+    @property
+    def mask(self):
+        """
+        Le pygame.mask.Mask des pixels pleins (solid), à jour des dernières modifications.
+        """
+        if self._mask is None:
+            self._mask = mask_from_array(self.solid)
+        for rect in self._stale:
+            self._mask.erase(pygame.mask.Mask(rect.size, fill=True), rect.topleft)
+            self._mask.draw(mask_from_array(self.solid[rect.top:rect.bottom, rect.left:rect.right]), rect.topleft)
+        self._stale = []
+        return self._mask
+
+    def overlaps(self, mask, x, y):
+        """
+        Vérifie, au pixel près, si un masque placé sur la carte touche des pixels pleins.
+
+        Paramètres :
+        - mask : Un pygame.mask.Mask (par exemple celui d'une image de lemming, voir World.frame_masks).
+        - x, y : La position sur la carte du coin haut gauche du masque.
+
+        Retourne :
+        Un booléen.
+        """
+        return self.mask.overlap(mask, (int(x), int(y))) is not None
+
+    @staticmethod
+    def _span_count(cs, base, stride, starts, ends, chunks):
+        """
+        Compte les pixels pleins entre starts (inclus) et ends (exclu) à l'aide de sommes
+        cumulées par tronçons, pour des intervalles d'au plus CHUNK_SIZE pixels (donc à cheval
+        sur au plus deux tronçons).
+
+        Dans un tronçon c, la somme des k premières cases de la position v = c * CHUNK_SIZE + k
+        se trouve à l'indice base + (v + c) * stride de cs. La somme d'un intervalle qui finit
+        dans le tronçon c1 est la somme de sa fin dans c1, plus celle de la fin du tronçon c0
+        où il commence (nulle si c0 = c1), moins celle de son début.
+
+        Paramètres :
+        - cs : Les sommes cumulées, aplaties.
+        - base : L'indice dans cs du début de la ligne (ou de la colonne) de chaque intervalle.
+        - stride : Le pas d'indice dans cs entre deux cases consécutives.
+        - starts, ends : Les bornes des intervalles, déjà limitées à la carte.
+        - chunks : Le nombre de tronçons.
+
+        Retourne :
+        Un tableau NumPy d'entiers (nul pour un intervalle vide).
+        """
+        c0 = np.minimum(starts // CHUNK_SIZE, chunks - 1)
+        c1 = np.clip((ends - 1) // CHUNK_SIZE, c0, chunks - 1)
+        total = cs[base + (ends + c1) * stride].astype(np.int32)
+        total += cs[base + (c1 * CHUNK_SIZE + c0) * stride]
+        total -= cs[base + (starts + c0) * stride]
+        return np.where(ends > starts, total, 0)
+
+    @classmethod
+    def from_surface(cls, surf):
+        """
+        Construit le terrain à partir de l'image de la carte.
+
+        Paramètres :
+        - surf : La surface Pygame de la carte.
+
+        Retourne :
+        Un nouvel objet Terrain.
+        """
+        return cls(surface_non_black(surf))
+
+    def add_decor(self, surf, pos):
+        """
+        Ajoute un élément fixe (non destructible) qui sert de sol aux lemmings.
+
+        Paramètres :
+        - surf : La surface Pygame de l'élément.
+        - pos : Un tuple (x, y) représentant la position de l'élément sur la carte.
+        """
+        mask = surface_non_black(surf)
+        if surf.get_flags() & pygame.SRCALPHA:
+            # Les pixels transparents laissent voir la carte : ils ne comptent pas
+            mask &= pygame.surfarray.array_alpha(surf).T != 0
+        x, y = pos
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + mask.shape[1], self.width), min(y + mask.shape[0], self.height)
+        if x0 < x1 and y0 < y1:
+            self.decor[y0:y1, x0:x1] |= mask[y0 - y:y1 - y, x0 - x:x1 - x]
+            self._refresh(x0, y0, x1, y1)
+
+    def share(self):
+        """
+        Place les grilles du terrain en mémoire partagée (multiprocessing.shared_memory).
+
+        Le terrain fonctionne ensuite comme avant ; ses modifications sont vues par les terrains
+        ouverts avec attach dans d'autres processus. unshare libère la mémoire partagée.
+
+        Retourne :
+        Un dictionnaire décrivant les grilles partagées, à donner à Terrain.attach.
+        """
+        spec = {}
+        for name in _SHARED:
+            array = getattr(self, name)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            shared = np.ndarray(array.shape, array.dtype, buffer=block.buf)
+            shared[...] = array
+            setattr(self, name, shared)
+            self._blocks.append(block)
+            spec[name] = (block.name, array.shape, array.dtype.str)
+        return spec
+
+    @classmethod
+    def attach(cls, spec):
+        """
+        Ouvre, dans un autre processus, les grilles d'un terrain placées en mémoire partagée.
+
+        Le terrain obtenu sert aux recherches (sol, murs) ; il ne doit pas être modifié.
+
+        Paramètres :
+        - spec : La description retournée par Terrain.share.
+
+        Retourne :
+        Un nouvel objet Terrain.
+        """
+        terrain = cls.__new__(cls)
+        terrain._blocks = []
+        for name, (block_name, shape, dtype) in spec.items():
+            block = shared_memory.SharedMemory(name=block_name)
+            setattr(terrain, name, np.ndarray(shape, dtype, buffer=block.buf))
+            terrain._blocks.append(block)
+        terrain.height, terrain.width = terrain.solid.shape
+        terrain._chunks_x = -(-terrain.width // CHUNK_SIZE)
+        terrain._chunks_y = -(-terrain.height // CHUNK_SIZE)
+        terrain._mask = None
+        terrain._stale = []
+        return terrain
+
+    def unshare(self):
+        """
+        Recopie les grilles du terrain en mémoire privée et libère la mémoire partagée par share.
+        """
+        if not self._blocks:
+            return
+        for name in _SHARED:
+            setattr(self, name, getattr(self, name).copy())
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def ground_under_many(self, xs, ys, widths):
+        """
+        Vérifie, pour plusieurs lemmings à la fois, s'il y a du sol sur la ligne ys, entre les
+        colonnes xs et xs + widths - 1.
+
+        Paramètres :
+        - xs, ys, widths : Des tableaux NumPy d'entiers de même longueur (largeurs d'au plus CHUNK_SIZE).
+
+        Retourne :
+        Un tableau NumPy de booléens. Les pixels hors de la carte sont considérés comme vides.
+        """
+        valid = (ys >= 0) & (ys < self.height)
+        yc = np.clip(ys, 0, self.height - 1)
+        x0 = np.clip(xs, 0, self.width)
+        x1 = np.clip(xs + widths, 0, self.width)
+        count = self._span_count(
+            self._ground_cs.reshape(-1), yc * (self._chunks_x * (CHUNK_SIZE + 1)), 1, x0, x1, self._chunks_x
+        )
+        return valid & (count > 0)
+
+    def ground_below_many(self, xs, ys, widths):
+        """
+        Cherche, pour plusieurs lemmings à la fois, la première ligne de sol à partir de la
+        ligne ys, entre les colonnes xs et xs + widths - 1.
+
+        Le coût ne dépend que de la largeur, pas de la distance jusqu'au sol.
+
+        Paramètres :
+        - xs, ys, widths : Des tableaux NumPy d'entiers de même longueur.
+
+        Retourne :
+        Un tableau NumPy d'entiers : la ligne trouvée, ou la hauteur de la carte s'il n'y a
+        pas de sol en dessous. Les pixels hors de la carte sont considérés comme vides.
+        """
+        if len(xs) == 0:
+            return np.zeros(0, np.int32)
+        # Une case par colonne couverte : [lemming, décalage dans la largeur]
+        offsets = np.arange(int(widths.max()))
+        cols = xs[:, None] + offsets
+        inside = (offsets < widths[:, None]) & (cols >= 0) & (cols < self.width)
+        rows = np.clip(ys, 0, self.height)[:, None]
+        below = self._below[rows, np.clip(cols, 0, self.width - 1)]
+        return np.where(inside, below, self.height).min(axis=1).astype(np.int32)
+
+    def wall_at_many(self, xs, ys, heights):
+        """
+        Vérifie, pour plusieurs lemmings à la fois, s'il y a un mur dans la colonne xs, entre
+        les lignes ys et ys + heights - 1.
+
+        Paramètres :
+        - xs, ys, heights : Des tableaux NumPy d'entiers de même longueur (hauteurs d'au plus CHUNK_SIZE).
+
+        Retourne :
+        Un tableau NumPy de booléens. Les pixels hors de la carte sont considérés comme vides.
+        """
+        valid = (xs >= 0) & (xs < self.width)
+        xc = np.clip(xs, 0, self.width - 1)
+        y0 = np.clip(ys, 0, self.height)
+        y1 = np.clip(ys + heights, 0, self.height)
+        count = self._span_count(self._wall_cs.reshape(-1), xc, self.width, y0, y1, self._chunks_y)
+        return valid & (count > 0)
+
+    def clear_mask(self, mask):
+        """
+        Efface tous les pixels de décor d'un masque de la taille de la carte, en une seule opération.
+
+        Paramètres :
+        - mask : Tableau de booléens indexé [y, x], vrai pour les pixels à effacer.
+        """
+        rows = np.flatnonzero(mask.any(axis=1))
+        if rows.size == 0:
+            return
+        cols = np.flatnonzero(mask.any(axis=0))
+        self.solid &= ~mask
+        self._refresh(int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1)
+
+    def clear_pixels(self, ys, xs):
+        """
+        Efface des pixels de décor, en une seule opération.
+
+        Paramètres :
+        - ys, xs : Des tableaux NumPy de coordonnées, déjà limitées à la carte.
+        """
+        if len(xs) == 0:
+            return
+        self.solid.reshape(-1)[ys * self.width + xs] = False
+        self._refresh(int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1)
+
+    def fill_pixels(self, ys, xs):
+        """
+        Remet des pixels de décor effacés, en une seule opération (retour en arrière, voir src/rewind.py).
+
+        Paramètres :
+        - ys, xs : Des tableaux NumPy de coordonnées, déjà limitées à la carte.
+        """
+        if len(xs) == 0:
+            return
+        self.solid.reshape(-1)[ys * self.width + xs] = True
+        self._refresh(int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1)
@@ -0,0 +1,66 @@
+"""
+Ce module cadence la simulation à pas fixe, indépendamment de l'affichage.
+
+Le temps réel écoulé entre deux images est accumulé puis converti en un nombre entier de pas
+de simulation (voir TICKS_PER_SECOND dans src/world.py) : une image lente est rattrapée par
+plusieurs pas à l'image suivante, sans changer le déroulement de la partie. En accéléré, le
+temps écoulé est multiplié, ce qui enchaîne plusieurs pas par image.
+
+Classes :
+- FixedTimestep : Convertit le temps réel écoulé en pas de simulation.
+
+Constantes :
+- SPEEDS : Les multiplicateurs de vitesse proposés (vitesse normale et accélérés).
+- MAX_FRAME_TIME : Le temps réel maximal (en secondes) rattrapé en une seule image.
+"""
+
+from src.world import TICKS_PER_SECOND
+
+SPEEDS = (1, 2, 4, 16)
+MAX_FRAME_TIME = 0.25
+
+
+class FixedTimestep:
+    """
+    Convertit le temps réel écoulé en pas de simulation.
+
+    Attributs :
+    - ticks_per_second : Le nombre de pas de simulation par seconde de jeu.
+    - speed : Le multiplicateur de vitesse actuel (voir SPEEDS).
+    - alpha : La fraction du pas suivant déjà écoulée (entre 0 et 1), pour interpoler l'affichage.
+    """
+
+    def __init__(self, ticks_per_second=TICKS_PER_SECOND):
+        self.ticks_per_second = ticks_per_second
+        self.speed = SPEEDS[0]
+        self._accumulator = 0.0
+        self.alpha = 0.0
+
+    def next_speed(self):
+        """
+        Passe au multiplicateur de vitesse suivant (après le dernier, revient à la vitesse normale).
+
+        Retourne :
+        Le nouveau multiplicateur.
+        """
+        self.speed = SPEEDS[(SPEEDS.index(self.speed) + 1) % len(SPEEDS)]
+        return self.speed
+
+    def advance(self, elapsed):
+        """
+        Ajoute le temps réel écoulé et retourne le nombre de pas de simulation à effectuer.
+
+        Au-delà de MAX_FRAME_TIME (machine trop lente, fenêtre déplacée), le retard est
+        abandonné : la partie ralentit au lieu de geler l'affichage pour le rattraper.
+
+        Paramètres :
+        - elapsed : Le temps réel écoulé depuis l'appel précédent, en secondes.
+
+        Retourne :
+        Un entier positif ou nul.
+        """
+        self._accumulator += min(elapsed, MAX_FRAME_TIME) * self.speed * self.ticks_per_second
+        ticks = int(self._accumulator)
+        self._accumulator -= ticks
+        self.alpha = self._accumulator
+        return ticks
@@ -0,0 +1,918 @@
+"""
+Ce module implémente le modèle du monde : le terrain, les lemmings et leur simulation.
+
+La simulation ne lit jamais l'écran. L'affichage (voir src/render.py) et les sons (voir
+src/game.py) se contentent de consulter le monde après chaque pas de simulation, ce qui
+permet d'avancer la simulation sans rien dessiner.
+
+Les lemmings sont stockés en colonnes NumPy (voir src/lemmings.py). Les transitions et les
+actions reçoivent les indices de tous les lemmings concernés et les traitent en une fois :
+les actions qui modifient le décor effacent des formes précalculées (voir src/stamps.py).
+
+Les lemmings arrêtés sont au repos : ils ne bougent pas et leur boîte de collision ne change
+plus, les transitions et les actions les ignorent donc (voir World.active_lemmings). Un
+lemming au repos n'est réveillé que par un changement d'état donné par le joueur. Un niveau
+plein de lemmings arrêtés coûte ainsi à peu près autant qu'un niveau où ils marchent tous.
+
+Classes :
+- World : Le monde du jeu (décor, sortie, lemmings, compteurs).
+
+Fonctions :
+- actionMarche(world, idx) : Effectue l'action de marche pour des lemmings.
+- actionChute(world, idx) : Effectue l'action de chute pour des lemmings.
+- actionFloater(world, idx) : Effectue l'action de flottement pour des lemmings.
+- actionBomber(world, idx) : Effectue l'action de bombardement pour des lemmings.
+- actionDead(world, idx) : Effectue l'action de mort pour des lemmings.
+- actionStop(world, idx) : Effectue l'action d'arrêt pour des lemmings.
+- actionSpeeder(world, idx) : Effectue l'action de vitesse pour des lemmings.
+- actionCreuser(world, idx) : Effectue l'action de creuser pour des lemmings.
+- actionCreuserDiagonal(world, idx) : Effectue l'action de creuser en diagonale pour des lemmings.
+- actionCreuserHorizontal(world, idx) : Effectue l'action de creuser horizontalement pour des lemmings.
+- update_states(world, idx) : Applique les transitions d'état à des lemmings.
+- perform_actions(world, idx, etats) : Effectue l'action de chaque lemming selon son état.
+- creerLemming(world) : Crée un nouveau lemming et l'ajoute au monde.
+- check_click_on_lemming(world, x, y) : Vérifie si un événement de clic s'est produit sur un lemming.
+- check_collision_lemming_stopped(world, idx) : Vérifie si des lemmings sont en collision avec un lemming arrêté.
+- check_collision_lemming_wall(world, idx) : Vérifie si des lemmings sont en collision avec un mur.
+- check_if_lemming_can_fall(world, idx) : Vérifie si des lemmings peuvent tomber à leur position actuelle.
+- find_landing(world, idx) : Prévoit où des lemmings en chute arriveront, et s'ils en mourront.
+- is_on_exit(world, idx) : Vérifie si des lemmings sont sur la sortie.
+
+Dans ces fonctions, idx désigne les indices des lemmings concernés : un tableau NumPy
+d'entiers ou slice(None) pour tous les lemmings.
+
+Constantes :
+- EtatMarche, EtatChute, EtatStop, EtatDead, EtatMiner, EtatMinerHorizontal, EtatSpeeder, EtatMinerDiagonal, EtatFloater, EtatBomber : Codes des différents états d'un lemming.
+- ETAT_LIBELLES : Le nom affiché de chaque état, indexé par son code.
+- SERIE_PAR_ETAT : L'animation (voir src/sprites.py) utilisée pour chaque état.
+- MAX_LEMMING_ACTIVE_SPEED_STATE : Le nombre maximal de lemmings accélérés en même temps.
+- TICKS_PER_SECOND : Le nombre de pas de simulation par seconde de jeu.
+- MAX_CARVED_RECTS : Le nombre maximal de zones effacées conservées avant fusion (voir World.add_carved).
+- ActionToPerform : Un dictionnaire associant chaque état à son action.
+"""
+
+import random
+import numpy as np
+import pygame
+
+from src.assets import Assets
+from src.lemmings import Lemmings
+from src.profiler import Profiler
+from src.spatial import RectUnion, SpatialHash
+from src.stamps import EXPLOSION, Stamp, carve
+from src.sprites import SERIES
+from src.terrain import Terrain
+
+MAX_LEMMING_ACTIVE_SPEED_STATE = 4
+TICKS_PER_SECOND = 20
+MAX_CARVED_RECTS = 64
+
+# liste des etats
+EtatMarche = 0
+EtatChute = 1
+EtatStop = 2
+EtatDead = 3
+EtatMiner = 4
+EtatMinerHorizontal = 5
+EtatSpeeder = 6
+EtatMinerDiagonal = 7
+EtatFloater = 8
+EtatBomber = 9
+
+ETAT_LIBELLES = (
+    "Marche",
+    "Chute",
+    "Arrêt",
+    "Tuer",
+    "Miner vers le bas",
+    "Minage Verticalement",
+    "Vélocité Accrue (max " + str(MAX_LEMMING_ACTIVE_SPEED_STATE) + ") lemmings",
+    "Minage Diagonale",
+    "Flotter",
+    "Kamizake",
+)
+
+SERIE_PAR_ETAT = {
+    EtatMarche: "marche",
+    EtatChute: "tombe",
+    EtatStop: "stop",
+    EtatDead: "dead",
+    EtatMiner: "miner",
+    EtatMinerHorizontal: "miner",
+    EtatSpeeder: "marche",
+    EtatMinerDiagonal: "miner",
+    EtatFloater: "floater",
+    EtatBomber: "bomber",
+}
+
+
+def actionMarche(world, idx):
+    """
+    Effectue l'action de marche pour des lemmings.
+
+    Paramètres :
+    - world : Le monde du jeu.
+    - idx : Les indices des lemmings concernés.
+    """
+    L = world.lemmings
+    L.x[idx] += L.vx[idx] * 1
+
+
+def actionChute(world, idx):
+    """
+    Effectue l'action de chute pour des lemmings.
+
+    Paramètres :
+    - world : Le monde du jeu.
+    - idx : Les indices des lemmings concernés.
+    """
+    L = world.lemmings
+    L.y[idx] += 1
+    L.fallcount[idx] += 1
+
+def actionFloater(world, idx):
+    """
+    Effectue l'action de flottement pour des lemmings.
+
+    Paramètres :
+    - world : Le monde du jeu.
+    - idx : Les indices des lemmings concernés.
+    """
+    world.lemmings.y[idx] += 1
+
+def actionBomber(world, idx):
+    """
+    Effectue l'action de bombardement pour des lemmings.
+
+    Paramètres :
+    - world : Le monde du jeu.
+    - idx : Les indices des lemmings concernés.
+    """
+    L = world.lemmings
+    # Seuls les lemmings dont l'animation est terminée explosent
+    idx = idx[L.dead_no_anim[idx]]
+    # Effacer du décor autour des lemmings en sphère, tous à la fois
+    world.carve(EXPLOSION, L.x[idx] + L.w[idx] // 2, L.y[idx] + L.h[idx] // 2)
+    L.etat[idx] = EtatDead
+
+def actionDead(world, idx):
+    """
+    Effectue l'action de mort pour des lemmings.
+
+    Paramètres :
+    - world : Le monde du jeu.
+    - idx : Les indices des lemmings concernés.
+    """
+    pass
+
+
+def actionStop(world, idx):
+    """
+    Effectue l'action d'arrêt pour des lemmings.
+
+    Paramètres :
+    - world : Le monde du jeu.
+    - idx : Les indices des lemmings concernés.
+    """
+    pass
+
+def actionSpeeder(world, idx):
+    """
+    Effectue l'action de vitesse pour des lemmings.
+
+    Le nombre de lemmings accélérés est limité : les lemmings sont traités un par un, dans
+    l'ordre, pour attribuer les places restantes.
+
+    Paramètres :
+    - world : Le monde du jeu.
+    - idx : Les indices des lemmings concernés.
+    """
+    L = world.lemmings
+    for lemming in idx:
+        if world.currentActiveSpeeders < MAX_LEMMING_ACTIVE_SPEED_STATE or L.in_speed[lemming]:
+            if not L.in_speed[lemming]:
+                world.currentActiveSpeeders += 1
+            L.in_speed[lemming] = True
+            L.x[lemming] += L.vx[lemming] * 3
+        else:
+            L.etat[lemming] = EtatMarche
+            world.events.append("no")
+
+
+# Ajouter l'état Creuser et la logique d'animation
+def actionCreuser(world, idx):
+    """
+    Effectue l'action de creuser verticalement pour des lemmings.
+
+    Paramètres :
+    - world : Le monde du jeu.
+    - idx : Les indices des lemmings concernés.
+    """
+    L = world.lemmings
+    L.creuser_timer[idx] += 1
+    idx = idx[L.creuser_timer[idx] % 10 == 0]  # Toutes les 0.5 secondes
+    # Effacer du décor sous les lemmings
+    world.carve(Stamp.rect(20, 1), L.x[idx], L.y[idx] + L.h[idx])
+    L.y[idx] += 1  # Descendre d'un pixel pour continuer à creuser
+
+def  actionCreuserDiagonal(world, idx):
+    """
+    Effectue l'action de creuser en diagonale pour des lemmings.
+
+    Paramètres :
+    - world : Le monde du jeu.
+    - idx : Les indices des lemmings concernés.
+    """
+    L = world.lemmings
+    L.creuser_timer[idx] += 1
+    idx = idx[L.creuser_timer[idx] % 20 == 0]  # Toutes les 1 secondes
+    # Effacer du décor sous les lemmings
+    world.carve(Stamp.rect(40, 1), L.x[idx], L.y[idx] + L.h[idx])
+    L.y[idx] += 1  # Descendre d'un pixel pour continuer à creuser
+    L.x[idx] += L.vx[idx]  # Déplacer le lemming en diagonale
+
+
+def actionCreuserHorizontal(world, idx):
+    """
+    Effectue l'action de creuser horizontalement pour des lemmings.
+
+    Paramètres :
+    - world : Le monde du jeu.
+    - idx : Les indices des lemmings concernés.
+    """
+    L = world.lemmings
+    L.creuser_timer[idx] += 1
+    # Effacer du décor devant les lemmings en fonction de leur direction : à droite
+    # (après le lemming) ou à gauche (sur sa première colonne et la précédente)
+    xs = np.where(L.vx[idx] == 1, L.x[idx] + L.w[idx], L.x[idx] - 1)
+    heights = L.h[idx]
+    for h in np.unique(heights):
+        same = heights == h
+        world.carve(Stamp.rect(2, int(h)), xs[same], L.y[idx][same])
+
+    # Déplacer le lemming dans la direction où il a creusé
+    idx = idx[L.creuser_timer[idx] % 5 == 0]  # Toutes les 0.25 secondes
+    L.x[idx] += L.vx[idx]
+
+
+ActionToPerform = {
+    EtatSpeeder: actionSpeeder,
+    EtatMarche: actionMarche,
+    EtatChute: actionChute,
+    EtatDead: actionDead,
+    EtatStop: actionStop,
+    EtatMiner: actionCreuser,
+    EtatFloater: actionFloater,
+    EtatMinerHorizontal: actionCreuserHorizontal,
+    EtatMinerDiagonal: actionCreuserDiagonal,
+    EtatBomber: actionBomber,
+}
+
+
+def update_states(world, idx):
+    """
+    Applique les transitions d'état à des lemmings actifs : chute, arrivée au sol (mortelle
+    ou non) et demi-tour devant un mur ou un lemming arrêté.
+
+    Chaque lemming ne dépend que du terrain et des lemmings arrêtés, qui ne changent pas
+    pendant les transitions : les lemmings peuvent être traités par groupes, dans n'importe
+    quel ordre (voir src/parallel.py).
+
+    Paramètres :
+    - world : Le monde du jeu.
+    - idx : Les indices des lemmings concernés, qui ne doivent pas être au repos.
+    """
+    L = world.lemmings
+    can_fall = check_if_lemming_can_fall(world, idx)
+    etat = L.etat[idx]
+
+    falling = (etat == EtatChute) | (etat == EtatFloater)
+    landing = falling & ~can_fall
+    crash = landing & (etat == EtatChute) & (L.fallcount[idx] > 100)
+    land = landing & ~crash
+    walking = (etat == EtatMarche) | (etat == EtatSpeeder)
+    mining = (etat == EtatMiner) | (etat == EtatMinerHorizontal) | (etat == EtatMinerDiagonal)
+
+    # Changer de direction (avec la boîte de collision avant changement d'état)
+    walkers = idx[walking]
+    turn = walkers[
+        check_collision_lemming_stopped(world, walkers) | check_collision_lemming_wall(world, walkers)
+    ]
+
+    crash = idx[crash]
+    land = idx[land]
+    L.etat[crash] = EtatDead
+    #play the dead sound
+    world.events.extend(["die"] * crash.size)
+    L.etat[land] = EtatMarche
+    L.fallcount[land] = 0
+    L.etat[idx[(walking | mining) & can_fall]] = EtatChute
+    L.vx[turn] = -L.vx[turn]
+
+
+def perform_actions(world, idx, etats=ActionToPerform):
+    """
+    Effectue l'action de chaque lemming selon son état, état par état.
+
+    Paramètres :
+    - world : Le monde du jeu.
+    - idx : Les indices des lemmings concernés.
+    - etats : Les états dont l'action est effectuée, dans l'ordre (tous par défaut).
+    """
+    etat = world.lemmings.etat[idx]
+    # Les groupes sont formés avant d'agir : un lemming dont l'action change l'état
+    # n'effectue pas une seconde action dans le même pas
+    groups = [(ActionToPerform[e], idx[etat == e]) for e in etats]
+    for action, group in groups:
+        if group.size:
+            action(world, group)
+
+
+# Fonction pour créer un nouveau lemming
+def creerLemming(world):
+    """
+    Crée un nouveau lemming et l'ajoute au monde.
+
+    Paramètres :
+    - world : Le monde du jeu.
+
+    Retourne :
+    L'indice du nouveau lemming.
+    """
+    anim = world.anim_code("tombe", False)
+    world.wake()
+    i = world.lemmings.add(
+        id=world.compteur_creation,
+        x=world.spawn[0],
+        y=world.spawn[1],
+        prev_x=world.spawn[0],
+        prev_y=world.spawn[1],
+        vx=1,
+        etat=EtatChute,
+        fallcount=0,
+        decal=world.random.randint(0, 10),
+        creuser_timer=0,
+        anim=anim,
+        frame=0,
+        w=world.frame_w[anim, 0],
+        h=world.frame_h[anim, 0],
+    )
+    world.handles[world.compteur_creation] = world.lemmings.handle(i)
+    return i
+
+
+def check_click_on_lemming(world, x, y):
+    """
+    Vérifie si un événement de clic s'est produit sur un lemming.
+
+    Paramètres :
+    - world : Le monde du jeu.
+    - x : La position x du clic.
+    - y : La position y du clic.
+
+    Retourne :
+    Un tuple (bool, int) où le booléen indique si le clic s'est produit sur un lemming et l'entier représente l'indice du lemming (voir World.lemming_at).
+    """
+    lemming = world.lemming_at(x, y)
+    if lemming is None:
+        return False, None
+    return True, lemming
+
+
+def check_collision_lemming_stopped(world, idx):
+    """
+    Vérifie si des lemmings sont en collision avec un lemming arrêté.
+
+    Les boîtes des lemmings arrêtés sont réunies une fois pour toutes (voir World.blockers) :
+    le coût ne dépend pas du nombre de lemmings arrêtés autour de chaque lemming.
+
+    Paramètres :
+    - world : Le monde du jeu.
+    - idx : Les indices des lemmings concernés, qui ne doivent pas être eux-mêmes arrêtés.
+
+    Retourne :
+    Un tableau de booléens indiquant pour chaque lemming s'il y a collision avec un lemming arrêté.
+    """
+    L = world.lemmings
+    # Intersection des rectangles, comme pygame.Rect.colliderect
+    return world.blockers.overlaps(L.x[idx], L.y[idx], L.w[idx], L.h[idx])
+
+
+def check_collision_lemming_wall(world, idx):
+    """
+    Vérifie si des lemmings sont en collision avec un mur.
+
+    Paramètres :
+    - world : Le monde du jeu.
+    - idx : Les indices des lemmings concernés.
+
+    Retourne :
+    Un tableau de booléens indiquant pour chaque lemming s'il y a collision avec un mur.
+    """
+    L = world.lemmings
+    x, vx, w = L.x[idx], L.vx[idx], L.w[idx]
+    # Colonne testée : juste à gauche du lemming, ou un pixel après son bord droit
+    wall_x = np.where(vx == -1, x - 1, x + w + 1)
+    return world.terrain.wall_at_many(wall_x, L.y[idx], L.h[idx])
+
+
+def check_if_lemming_can_fall(world, idx):
+    """
+    Vérifie si des lemmings peuvent tomber à leur position actuelle.
+
+    Paramètres :
+    - world : Le monde du jeu.
+    - idx : Les indices des lemmings concernés.
+
+    Retourne :
+    Un tableau de booléens indiquant pour chaque lemming s'il peut tomber (aucun pixel de sol sous ses pieds).
+    """
+    L = world.lemmings
+    return ~world.terrain.ground_under_many(L.x[idx], L.y[idx] + L.h[idx], L.w[idx])
+
+
+def find_landing(world, idx):
+    """
+    Prévoit où des lemmings en chute arriveront, et s'ils en mourront.
+
+    Le sol est cherché directement sous la boîte de collision actuelle (voir
+    Terrain.ground_below_many), quelle que soit la hauteur de la chute : il n'est pas testé
+    pixel par pixel. Un lemming en chute meurt s'il a parcouru plus de 100 pixels en
+    arrivant ; un lemming qui flotte ne meurt jamais.
+
+    Paramètres :
+    - world : Le monde du jeu.
+    - idx : Les indices des lemmings concernés.
+
+    Retourne :
+    Un tuple (rows, lethal) de tableaux NumPy : la ligne du sol sous chaque lemming (la
+    hauteur de la carte s'il n'y en a pas) et le booléen indiquant si l'arrivée sera mortelle.
+    """
+    L = world.lemmings
+    feet = L.y[idx] + L.h[idx]
+    rows = world.terrain.ground_below_many(L.x[idx], feet, L.w[idx])
+    lethal = (L.etat[idx] == EtatChute) & (L.fallcount[idx] + rows - feet > 100) & (rows < world.terrain.height)
+    return rows, lethal
+
+
+def is_on_exit(world, idx):
+    """
+    Vérifie si des lemmings sont sur la sortie.
+
+    Paramètres :
+    - world : Le monde du jeu.
+    - idx : Les indices des lemmings concernés.
+
+    Retourne :
+    Un tableau de booléens indiquant pour chaque lemming s'il est entièrement à l'intérieur de la sortie.
+    """
+    L = world.lemmings
+    ex, ey = world.exit_pos
+    ew, eh = world.sortie.get_size()
+    x, y = L.x[idx], L.y[idx]
+    return (x >= ex) & (y >= ey) & (x + L.w[idx] <= ex + ew) & (y + L.h[idx] <= ey + eh)
+
+
+class World:
+    """
+    Le monde du jeu : décor, sortie, lemmings et compteurs de la partie.
+
+    Le monde possède la surface du décor `fond` (modifiée par le creusage en même temps que
+    `terrain`) ; l'affichage ne fait que la lire. Les événements sonores produits pendant un pas
+    de simulation sont accumulés dans `events` ("escaped", "die", "no").
+
+    Attributs :
+    - fond : La surface Pygame du décor.
+    - sortie : La surface Pygame de la sortie.
+    - terrain : La grille d'occupation du décor (voir src/terrain.py). Elle est calculée à partir
+      de fond et sortie, sauf si un niveau précompilé la fournit (voir src/level.py).
+    - animations : Les animations des lemmings (voir src/sprites.py).
+    - frames : Les images de chaque animation, indexées par code d'animation (voir anim_code).
+    - frame_w, frame_h, frame_count : Tableaux NumPy des dimensions de chaque image
+      ([animation, image]) et du nombre d'images de chaque animation.
+    - frame_masks : Le masque (pygame.mask.Mask) des pixels visibles de chaque image, indexé comme frames.
+    - sprites, frame_stride : Les images de frames à plat, l'image `frame` de l'animation `anim`
+      étant à l'indice anim * frame_stride + frame (voir sprite_keys).
+    - spawn : Un tuple (x, y) représentant la position d'apparition des lemmings.
+    - exit_pos : Un tuple (x, y) représentant la position de la sortie.
+    - lemmings : Les lemmings actuellement dans le jeu (voir src/lemmings.py).
+    - handles : Le repère stable (voir Lemmings.handle) de chaque lemming créé, par numéro de
+      création : index_of retrouve un lemming sans parcourir les colonnes.
+    - blockers : L'union des boîtes de collision des lemmings arrêtés (voir RectUnion dans
+      src/spatial.py). Elle n'est reconstruite, par active_lemmings, que lorsque ces boîtes
+      changent, car un lemming arrêté ne bouge pas.
+    - compteur_creation : Un entier comptant le nombre de lemmings créés.
+    - nb_lemmings : Le nombre total de lemmings à créer.
+    - nb_lemmings_arrived : Le nombre de lemmings qui ont atteint la sortie.
+    - nb_lemmings_dead : Le nombre de lemmings morts.
+    - time_limit : Le temps imparti en secondes.
+    - time : Le temps de la simulation en dixièmes de seconde, calculé à partir de tick.
+    - tick : Le nombre de pas de simulation effectués.
+    - carved : Les rectangles (pygame.Rect) du décor effacés depuis le dernier appel à pop_carved.
+    - seed : La graine du générateur aléatoire (tirée au hasard si elle n'est pas donnée).
+    - random : Le générateur aléatoire de la simulation (random.Random), initialisé avec seed.
+    - profiler : Le profileur qui chronomètre les transitions et les actions (voir src/profiler.py),
+      désactivé par défaut.
+    - rewind : L'historique qui permet de revenir en arrière (voir src/rewind.py), ou None.
+    - parallel : La répartition des transitions et des actions entre plusieurs processus (voir
+      src/parallel.py), ou None pour tout simuler dans ce processus.
+    """
+
+    def __init__(self, fond, sortie, animations, spawn=(256, 125), exit_pos=(646, 250), nb_lemmings=15, time_limit=120, seed=None, terrain=None):
+        self.fond = fond
+        self.sortie = sortie
+        self.animations = animations
+        self.spawn = spawn
+        self.exit_pos = exit_pos
+        if terrain is None:
+            terrain = Terrain.from_surface(fond)
+            terrain.add_decor(sortie, exit_pos)
+        self.terrain = terrain
+
+        # Table des animations : code = 2 * rang de la série + 1 si retournée
+        self.frames = []
+        for name in SERIES:
+            self.frames.append(animations[name])
+            self.frames.append(animations[name + "_flipped"])
+        longest = max(len(serie) for serie in self.frames)
+        self.frame_count = np.array([len(serie) for serie in self.frames], np.int32)
+        self.frame_w = np.zeros((len(self.frames), longest), np.int32)
+        self.frame_h = np.zeros((len(self.frames), longest), np.int32)
+        for anim, serie in enumerate(self.frames):
+            for frame, spr in enumerate(serie):
+                self.frame_w[anim, frame], self.frame_h[anim, frame] = spr.get_size()
+        self.frame_masks = [[pygame.mask.from_surface(spr) for spr in serie] for serie in self.frames]
+        # Animations dont toutes les images ont la même taille : la boîte de collision d'un
+        # lemming immobile qui les utilise ne change plus
+        self._steady = np.array([len({spr.get_size() for spr in serie}) == 1 for serie in self.frames])
+        # Les mêmes images à plat, à l'indice anim * frame_stride + frame : l'affichage retrouve
+        # le sprite de tous les lemmings par un seul calcul NumPy
+        self.frame_stride = longest
+        self.sprites = [None] * (len(self.frames) * longest)
+        for anim, serie in enumerate(self.frames):
+            self.sprites[anim * longest:anim * longest + len(serie)] = serie
+        # Rang de la série utilisée par chaque état
+        serie_rank = list(SERIES)
+        self._etat_serie = np.array(
+            [serie_rank.index(SERIE_PAR_ETAT[etat]) for etat in range(len(ETAT_LIBELLES))], np.int32
+        )
+
+        self.lemmings = Lemmings()
+        self.handles = {}
+        self.blockers = RectUnion([], [], [], [])
+        self._blocker_boxes = None
+        # Index de tous les lemmings pour les clics, reconstruit au plus une fois par pas
+        self._hit_index = SpatialHash(self.terrain.width, self.terrain.height)
+        self._hit_tick = None
+        # Indices des lemmings actifs, recalculés après un changement (voir active_lemmings)
+        self._active = None
+        self._settling = False
+        self.compteur_creation = 0
+        self.nb_lemmings = nb_lemmings
+        self.nb_lemmings_arrived = 0
+        self.nb_lemmings_dead = 0
+        self.currentActiveSpeeders = 0
+        self.time_limit = time_limit
+        self.time = 0
+        self.tick = 0
+        self.events = []
+        self.carved = []
+        # Seule source de hasard de la simulation : une partie est rejouable à partir de sa graine
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.random = random.Random(self.seed)
+        self.profiler = Profiler()
+        self.rewind = None
+        self.parallel = None
+
+    @classmethod
+    def load(cls, **kwargs):
+        """
+        Charge le niveau par défaut (map.png, sortie.png et planche.png).
+
+        Paramètres :
+        - kwargs : Les paramètres optionnels transmis au constructeur.
+
+        Retourne :
+        Un nouvel objet World.
+        """
+        assets = Assets()
+        return cls(assets.image("map.png"), assets.image("sortie.png"), assets.animations(), **kwargs)
+
+    def anim_code(self, name, flipped):
+        """
+        Retourne le code d'une animation dans la table `frames`.
+
+        Paramètres :
+        - name : Le nom de l'animation (voir SERIES dans src/sprites.py).
+        - flipped : Un booléen indiquant si l'animation est retournée.
+        """
+        return 2 * list(SERIES).index(name) + int(flipped)
+
+    def sprite_keys(self, idx):
+        """
+        Retourne l'indice dans `sprites` de l'image courante de plusieurs lemmings.
+
+        Paramètres :
+        - idx : Les indices des lemmings.
+
+        Retourne :
+        Un tableau NumPy d'entiers.
+        """
+        L = self.lemmings
+        return L.anim[idx] * self.frame_stride + L.frame[idx]
+
+    def active_lemmings(self):
+        """
+        Retourne les indices des lemmings actifs, les seuls traités par les transitions et les actions.
+
+        Un lemming arrêté est au repos dès que son animation d'arrêt a commencé : il ne bouge
+        plus, sa boîte de collision ne change plus et son action ne fait rien. Il ne peut
+        donc ni arriver à la sortie ni changer d'état sans que le joueur intervienne. Les
+        indices ne sont recalculés qu'après un ajout, une suppression ou un changement d'état
+        donné par le joueur (voir wake), pas à chaque pas ; l'union des boîtes des lemmings
+        arrêtés (blockers) est alors mise à jour si elles ont changé.
+
+        Retourne :
+        Un tableau NumPy d'indices croissants.
+        """
+        if self._active is None or self._settling:
+            L = self.lemmings
+            stopped = L.etat == EtatStop
+            resting = stopped & (L.anim == self._stop_anim(L.vx)) & self._steady[L.anim]
+            self._active = np.flatnonzero(~resting)
+            # Un lemming qui vient de s'arrêter reste actif jusqu'à ce que son animation d'arrêt commence
+            self._settling = bool(np.count_nonzero(stopped) != np.count_nonzero(resting))
+            stopped = np.flatnonzero(stopped)
+            boxes = np.stack([L.x[stopped], L.y[stopped], L.w[stopped], L.h[stopped]])
+            if self._blocker_boxes is None or not np.array_equal(boxes, self._blocker_boxes):
+                self.blockers = RectUnion(*boxes)
+                self._blocker_boxes = boxes
+        return self._active
+
+    def _stop_anim(self, vx):
+        """
+        Retourne le code de l'animation d'arrêt selon la direction des lemmings.
+        """
+        return 2 * self._etat_serie[EtatStop] + (vx == 1)
+
+    def wake(self):
+        """
+        Demande que les lemmings actifs soient recalculés au prochain pas (lemming ajouté ou
+        supprimé, état modifié en dehors des transitions et des actions).
+        """
+        self._active = None
+
+    def terrain_contacts(self, idx):
+        """
+        Vérifie, au pixel près, si l'image courante de lemmings touche des pixels pleins du décor.
+
+        Le masque de l'image (voir frame_masks) est comparé au masque du terrain (voir
+        Terrain.mask) avec pygame.mask.Mask.overlap, lemming par lemming : la boîte de
+        collision de la simulation est plus grossière (elle contient des pixels transparents),
+        mais se teste pour tous les lemmings en une seule opération.
+
+        Paramètres :
+        - idx : Les indices des lemmings concernés.
+
+        Retourne :
+        Un tableau de booléens.
+        """
+        L = self.lemmings
+        overlaps = self.terrain.overlaps
+        masks = self.frame_masks
+        return np.array([
+            overlaps(masks[anim][frame], x, y)
+            for anim, frame, x, y in zip(L.anim[idx].tolist(), L.frame[idx].tolist(), L.x[idx].tolist(), L.y[idx].tolist())
+        ], bool)
+
+    def lemming_at(self, x, y):
+        """
+        Cherche le lemming visible sous un point, au pixel près.
+
+        Seuls les lemmings des cases voisines du point sont examinés, d'abord par leur boîte de
+        collision puis par le masque de leur image courante. Le coût ne dépend donc presque
+        pas du nombre de lemmings : la recherche peut être faite à chaque image (survol).
+
+        Paramètres :
+        - x, y : La position du point.
+
+        Retourne :
+        L'indice du lemming affiché au premier plan sous le point (le dernier dessiné), ou None.
+        """
+        L = self.lemmings
+        if self._hit_tick != (self.tick, len(L)):
+            visible = np.flatnonzero(~L.dead_no_anim)
+            self._hit_index.build(visible, L.x[visible], L.y[visible])
+            self._hit_tick = (self.tick, len(L))
+        _, candidates = self._hit_index.query(np.array([x]), np.array([y]))
+        if candidates.size == 0:
+            return None
+        px, py = x - L.x[candidates], y - L.y[candidates]
+        inside = (px >= 0) & (px < L.w[candidates]) & (py >= 0) & (py < L.h[candidates])
+        # Du premier plan vers l'arrière-plan
+        for i in np.sort(candidates[inside])[::-1]:
+            if self.frame_masks[L.anim[i]][L.frame[i]].get_at((int(x - L.x[i]), int(y - L.y[i]))):
+                return int(i)
+        return None
+
+    def index_of(self, id):
+        """
+        Cherche un lemming à partir de son numéro de création.
+
+        Paramètres :
+        - id : Le numéro de création du lemming (colonne id).
+
+        Retourne :
+        L'indice du lemming, ou None s'il n'est plus en jeu.
+        """
+        handle = self.handles.get(id)
+        return None if handle is None else self.lemmings.resolve(handle)
+
+    def restore_lemmings(self, records):
+        """
+        Remplace tous les lemmings du jeu par des enregistrements (voir Lemmings.records), par
+        exemple ceux d'une sauvegarde.
+
+        Paramètres :
+        - records : Un tableau NumPy de type RECORD.
+        """
+        self.lemmings.load_records(records)
+        self.handles = {int(id): self.lemmings.handle(i) for i, id in enumerate(self.lemmings.id.tolist())}
+        self._hit_tick = None
+        self.wake()
+
+    def assign(self, lemming, etat):
+        """
+        Donne un nouvel état à un lemming (action choisie par le joueur).
+
+        Paramètres :
+        - lemming : L'indice du lemming.
+        - etat : Le nouvel état du lemming.
+
+        Retourne :
+        Un booléen indiquant si l'état a été appliqué.
+        """
+        if etat not in ActionToPerform.keys():
+            return False
+        self.lemmings.etat[lemming] = etat
+        self.wake()
+        return True
+
+    def carve(self, stamp, xs, ys):
+        """
+        Efface une forme du décor à une ou plusieurs positions (voir carve dans src/stamps.py).
+
+        Les actions passent par cette méthode : un groupe de lemmings traité dans un autre
+        processus note les formes à effacer au lieu de les effacer (voir src/parallel.py).
+
+        Paramètres :
+        - stamp : La forme à effacer.
+        - xs, ys : Les positions (entiers ou tableaux NumPy de même longueur).
+        """
+        carve(self, stamp, xs, ys)
+
+    def pop_events(self):
+        """
+        Retourne et vide la liste des événements sonores produits depuis le dernier appel.
+        """
+        events = self.events
+        self.events = []
+        return events
+
+    def add_carved(self, rect):
+        """
+        Note une zone du décor effacée, pour que l'affichage la redessine.
+
+        Si personne ne lit les zones (simulation sans affichage), elles sont fusionnées en un
+        seul rectangle pour que la liste ne grossisse pas indéfiniment.
+
+        Paramètres :
+        - rect : Un pygame.Rect contenant les pixels effacés.
+        """
+        self.carved.append(rect)
+        if len(self.carved) > MAX_CARVED_RECTS:
+            self.carved = [self.carved[0].unionall(self.carved[1:])]
+
+    def pop_carved(self):
+        """
+        Retourne et vide la liste des zones du décor effacées depuis le dernier appel.
+        """
+        carved = self.carved
+        self.carved = []
+        return carved
+
+    def step(self):
+        """
+        Avance la simulation d'un pas : création des lemmings, transitions, actions et animation.
+
+        Le temps de la simulation ne dépend que du nombre de pas effectués (voir
+        TICKS_PER_SECOND), jamais de l'horloge réelle.
+        """
+        time = self.tick * 10 // TICKS_PER_SECOND
+        self.time = time
+        self.tick += 1
+        L = self.lemmings
+        L.prev_x[:] = L.x
+        L.prev_y[:] = L.y
+
+        # creation des lemmings : 1 lemming toutes les 1,5 secondes
+        if (self.compteur_creation < self.nb_lemmings) and ((time + self.compteur_creation) % 30 == 0):
+            creerLemming(self)
+            self.compteur_creation += 1
+
+        if len(self.lemmings):
+            if self.parallel is not None:
+                # Mêmes étapes, réparties entre plusieurs processus
+                self.parallel.step()
+            else:
+                with self.profiler.phase("transitions"):
+                    self.transitions()
+                with self.profiler.phase("actions"):
+                    self.actions()
+        self.animate(time)
+        if self.rewind is not None:
+            self.rewind.record()
+
+    def transitions(self):
+        """
+        ETAPE 1 : gestion des transitions, pour tous les lemmings actifs à la fois.
+        """
+        active = self.remove_finished()
+        if len(self.lemmings):
+            update_states(self, active)
+
+    def remove_finished(self):
+        """
+        Retire du jeu les lemmings arrivés et les lemmings morts, et compte-les.
+
+        Retourne :
+        Les indices des lemmings actifs restants (voir active_lemmings).
+        """
+        L = self.lemmings
+        active = self.active_lemmings()
+        arrived = is_on_exit(self, active)
+        dead = (L.etat[active] == EtatDead) & ~arrived
+        nb_arrived = int(np.count_nonzero(arrived))
+        nb_dead = int(np.count_nonzero(dead))
+        if nb_arrived or nb_dead:
+            self.nb_lemmings_arrived += nb_arrived
+            self.nb_lemmings_dead += nb_dead
+            self.events.extend(["escaped"] * nb_arrived)
+            keep = np.ones(len(L), bool)
+            keep[active[arrived | dead]] = False
+            L.keep(keep)
+            self.wake()
+            active = self.active_lemmings()
+        return active
+
+    def actions(self):
+        """
+        ETAPE 2 : gestion des actions, état par état.
+        """
+        perform_actions(self, self.active_lemmings())
+
+    def animate(self, time):
+        """
+        Choisit l'image courante de chaque lemming. Elle détermine la boîte de collision
+        utilisée au pas suivant : elle fait donc partie de la simulation et non de l'affichage.
+
+        Paramètres :
+        - time : Le temps de la simulation en dixièmes de seconde.
+        """
+        L = self.lemmings
+        idx = np.flatnonzero(~L.dead_no_anim)
+        if idx.size == 0:
+            return
+        etat = L.etat[idx]
+        anim = 2 * self._etat_serie[etat] + (L.vx[idx] == 1)
+        count = self.frame_count[anim]
+        # L'animation de mort ne dépend pas du décalage aléatoire du lemming
+        frame = np.where(etat == EtatDead, time, time + L.decal[idx]) % count
+        L.anim[idx] = anim
+        L.frame[idx] = frame
+        L.w[idx] = self.frame_w[anim, frame]
+        L.h[idx] = self.frame_h[anim, frame]
+        finished = (frame == count - 1) & ((etat == EtatDead) | (etat == EtatBomber))
+        L.dead_no_anim[idx[finished]] = True
+
+    def time_left(self):
+        """
+        Retourne le temps restant en secondes.
+        """
+        return self.time_limit + 1 - self.time / 10
+
+    def result(self):
+        """
+        Détermine si la partie est terminée.
+
+        Retourne :
+        "WIN" si plus aucun lemming n'est en jeu et que plus des 2/3 sont arrivés, "LOOSE" si
+        tous les lemmings sont sortis du jeu sans atteindre ce score ou si le temps est écoulé,
+        None si la partie continue.
+        """
+        # Check if all lemmings are gone or dead and if more than 2/3 of the lemmings have arrived
+        if len(self.lemmings) == 0 and self.nb_lemmings_arrived > self.nb_lemmings * 2 / 3:
+            return "WIN"
+        if (len(self.lemmings) == 0 and self.compteur_creation > 0 and self.compteur_creation == self.nb_lemmings) or self.time / 10 >= self.time_limit:
+            return "LOOSE"
+        return None